@@ -5,6 +5,7 @@
 import os
 import sys
 import argparse
+import multiprocessing
 import logging
 import json
 from datetime import datetime
@@ -15,8 +16,7 @@ import redfish_service_validator.schema as schema
 from redfish_service_validator import tohtml, schema_pack, traverse
 from urllib.parse import urlparse, urlunparse
 from collections import Counter
-
-tool_version = '2.3.2'
+from redfish_service_validator.version import tool_version
 
 # Set up the custom debug levels
 VERBOSE1=logging.INFO-1
@@ -75,6 +75,19 @@ def validate(argslist=None, configfile=None):
     argget.add_argument('--uricheck', action="store_true", help='Allow URI checking on services below RedfishVersion 1.6.0')
     argget.add_argument('--schema_directory', type=str, default='./SchemaFiles/metadata', help='Directory for local schema files')
     argget.add_argument('--mockup', type=str, default='', help='Enables insertion of local mockup resources to replace missing, incomplete, or incorrect implementations retrieved from the service that may hinder full validation coverage')
+    argget.add_argument('--schema_cache', action='store_true', help='Store compiled schema files in a .catalog_cache folder of the schema directory, and use them on the next runs')
+    argget.add_argument('--lazy_catalog', action='store_true', help='Only read the schema files used by the service, when they are first needed')
+    argget.add_argument('--catalog_jobs', type=int, default=1, help='Number of processes used to parse schema files; default: 1')
+    argget.add_argument('--response_cache_size', type=int, default=100, help='Size in megabytes of the responses kept to avoid requesting a resource again; default: 100')
+    argget.add_argument('--jobs', type=int, default=1, help='Largest number of requests to the service made at once, ahead of the validation; default: 1')
+    argget.add_argument('--expand', action='store_true', help='Request collections with $expand, when the service supports it, instead of each of their members')
+    argget.add_argument('--paged_member_limit', type=int, default=0, help='Number of members followed through the Members@odata.nextLink pages of each collection; default: 0')
+    argget.add_argument('--sampling', type=str, default='LogEntry=first:15', help='Rules sampling the links of resources, as pattern=policy:size separated by semicolons; policies: first, reservoir, stratified; default: LogEntry=first:15')
+    argget.add_argument('--sampling_seed', type=int, default=0, help='Seed of the reservoir sampling policy; default: 0')
+    argget.add_argument('--record', type=str, default='', help='Folder to record the responses of the service into, as a mockup that can be given to --mockup on later runs')
+    argget.add_argument('--offline', action='store_true', help='Validate the complete mockup given with --mockup, without connecting to a service')
+    argget.add_argument('--etag_store', type=str, default='', help='File keeping the ETag, payload and result of each resource in between runs, so resources the service reports as not modified are not downloaded or validated again')
+    argget.add_argument('--result_store', type=str, default='', help='File keeping the result of each resource in between runs, so resources with the same payload are not validated again until the schema files, options or version of the tool change')
 
     # parse...
     args = argget.parse_args(argslist)
@@ -103,7 +116,7 @@ def validate(argslist=None, configfile=None):
     my_logger.info("")
 
     # config verification
-    if args.ip is None and configfile is None:
+    if args.ip is None and configfile is None and not args.offline:
         my_logger.error('No IP or Config Specified')
         argget.print_help()
         return 1, None, 'Configuration Incomplete'
@@ -117,17 +130,23 @@ def validate(argslist=None, configfile=None):
         with open(configfilename, 'w') as f:
             my_config.write(f)
 
-    scheme, netloc, path, params, query, fragment = urlparse(args.ip)
-    if scheme not in ['http', 'https', 'http+unix']:
-        my_logger.error('IP is missing http or https or http+unix')
-        return 1, None, 'IP Incomplete'
+    if args.offline:
+        if not os.path.exists(args.mockup):
+            my_logger.error('Offline validation needs the folder or archive of a complete mockup')
+            return 1, None, 'Mockup Incomplete'
+        my_logger.info('Target mockup: ' + args.mockup)
+    else:
+        scheme, netloc, path, params, query, fragment = urlparse(args.ip)
+        if scheme not in ['http', 'https', 'http+unix']:
+            my_logger.error('IP is missing http or https or http+unix')
+            return 1, None, 'IP Incomplete'
 
-    if netloc == '':
-        my_logger.error('IP is missing ip/host')
-        return 1, None, 'IP Incomplete'
+        if netloc == '':
+            my_logger.error('IP is missing ip/host')
+            return 1, None, 'IP Incomplete'
 
-    # start printing config details, remove redundant/private info from print
-    my_logger.info('Target URI: ' + args.ip)
+        # start printing config details, remove redundant/private info from print
+        my_logger.info('Target URI: ' + args.ip)
     my_logger.info('\n'.join(
         ['{}: {}'.format(x, vars(args)[x] if x not in ['password'] else '******') for x in sorted(list(vars(args).keys() - set(['description']))) if vars(args)[x] not in ['', None]]))
     my_logger.info('Start time: ' + startTick.strftime('%x - %X'))
@@ -230,9 +249,20 @@ def validate(argslist=None, configfile=None):
     success = success and not (fails > 0)
     my_logger.info("\n".join('{}: {}   '.format(x, y) for x, y in sorted(finalCounts.items())))
 
-    # dump cache info to debug log
+    # dump cache info to log
     my_logger.debug('getSchemaDetails() -> {}'.format(schema.getSchemaDetails.cache_info()))
-    my_logger.debug('callResourceURI() -> {}'.format(currentService.callResourceURI.cache_info()))
+    my_logger.info('Response cache: {}'.format(currentService.cache.getStats()))
+    if currentService.recorder is not None:
+        my_logger.info('Recorded {} responses into mockup {}'.format(currentService.recorder.recorded, currentService.config['record']))
+    if currentService.etags is not None:
+        my_logger.info('ETag store: {}'.format(currentService.etags.getStats()))
+    if currentService.results is not None:
+        my_logger.info('Result store: {}'.format(currentService.results.getStats()))
+    if currentService.expand_query is not None:
+        my_logger.info('Expanded collections: {} members taken from expanded responses without requesting them, so without checking their headers'.format(currentService.expanded))
+    if currentService.prefetcher is not None:
+        my_logger.info('Prefetch: {} requests made ahead, {} used, {} dropped'.format(currentService.prefetcher.requested, currentService.prefetcher.used, currentService.prefetcher.dropped))
+        my_logger.info('Concurrency window: {}'.format(currentService.prefetcher.window.getStats()))
 
     if not success:
         my_logger.error("Validation has failed: {} problems found".format(fails))
@@ -246,8 +276,56 @@ def main():
     """
     Entry point for the program.
     """
+    multiprocessing.freeze_support()
     status_code, _, _ = validate()
     return status_code
 
+
+def validateMockupOffline(argslist):
+    # many mockups are validated at once, so only their own logs are written
+    my_logger.removeHandler(standard_out)
+    return validate(argslist)
+
+def validateMockups(mockups, logdir='./logs', argslist=None, processes=None):
+    """Validates complete mockups offline, each in its own process
+
+    Args:
+        mockups (list): Folders or archives of the mockups
+        logdir (str, optional): Directory for the reports, with a folder named after each mockup. Defaults to './logs'.
+        argslist (list, optional): Other arguments of each validation, in the form of argv. Defaults to None.
+        processes (int, optional): Number of mockups validated at once. Defaults to the number of CPUs.
+
+    Returns:
+        dict: status code, report page and message of the validation of each mockup
+    """
+    runs, names = [], Counter()
+    for mockup in mockups:
+        name = os.path.basename(os.path.normpath(mockup))
+        names[name] += 1
+        if names[name] > 1:
+            name = '{}_{}'.format(name, names[name])
+        runs.append((argslist or []) + ['--offline', '--mockup', mockup, '--logdir', os.path.join(logdir, name)])
+
+    # a new process for each mockup, as each validation adds its own log handlers
+    with multiprocessing.Pool(processes, maxtasksperchild=1) as pool:
+        results = pool.map(validateMockupOffline, runs, chunksize=1)
+    return dict(zip(mockups, results))
+
+def mockups_main():
+    """
+    Entry point for validating mockups offline.
+    """
+    multiprocessing.freeze_support()
+    argget = argparse.ArgumentParser(description='DMTF tool to test complete mockups offline against a collection of Schema, version {}; other options are given to each validation'.format(tool_version))
+    argget.add_argument('mockups', type=str, nargs='+', help='Folders or archives of the mockups')
+    argget.add_argument('--processes', type=int, help='Number of mockups validated at once; default: number of CPUs')
+    argget.add_argument('--logdir', '--report-dir', type=str, default='./logs', help='The directory for generated report files, with a folder for each mockup; default: \'logs\'')
+    args, argslist = argget.parse_known_args()
+
+    results = validateMockups(args.mockups, args.logdir, argslist, args.processes)
+    for mockup, (status_code, report, message) in results.items():
+        my_logger.info('{}: {} ({})'.format(mockup, 'Validation has succeeded.' if status_code == 0 else 'Validation has failed.', report or message))
+    return max([x[0] for x in results.values()] + [0])
+
 if __name__ == '__main__':
     sys.exit(main())
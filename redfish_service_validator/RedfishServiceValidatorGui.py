@@ -11,6 +11,7 @@ Brief : This file contains the GUI to interact with the RedfishServiceValidator
 """
 
 import configparser
+import multiprocessing
 import os
 import threading
 import tkinter as tk
@@ -104,6 +105,58 @@ g_config_defaults = {
         "mockup": {
             "value": "",
             "description": "Enables insertion of local mockup resources to replace payloads from the service"
+        },
+        "schema_cache": {
+            "value": "False",
+            "description": "Whether to store and use compiled schema files in the schema directory"
+        },
+        "lazy_catalog": {
+            "value": "False",
+            "description": "Whether to only read schema files used by the service, when first needed"
+        },
+        "catalog_jobs": {
+            "value": "1",
+            "description": "Number of processes used to parse schema files"
+        },
+        "response_cache_size": {
+            "value": "100",
+            "description": "Size in megabytes of the responses kept to avoid requesting them again"
+        },
+        "jobs": {
+            "value": "1",
+            "description": "Largest number of requests to the service made at once, ahead of the validation"
+        },
+        "expand": {
+            "value": "False",
+            "description": "Whether to request collections with $expand, when the service supports it, instead of each of their members"
+        },
+        "paged_member_limit": {
+            "value": "0",
+            "description": "Number of members followed through the Members@odata.nextLink pages of each collection"
+        },
+        "sampling": {
+            "value": "LogEntry=first:15",
+            "description": "Rules sampling the links of resources, as pattern=policy:size separated by semicolons; policies: first, reservoir, stratified"
+        },
+        "sampling_seed": {
+            "value": "0",
+            "description": "Seed of the reservoir sampling policy"
+        },
+        "record": {
+            "value": "",
+            "description": "Folder to record the responses of the service into, as a mockup for later runs"
+        },
+        "offline": {
+            "value": "False",
+            "description": "Whether to validate the complete mockup given as mockup, without connecting to a service"
+        },
+        "etag_store": {
+            "value": "",
+            "description": "File keeping the ETag, payload and result of each resource in between runs"
+        },
+        "result_store": {
+            "value": "",
+            "description": "File keeping the result of each resource in between runs, reused for unchanged payloads"
         }
     }
 }
@@ -386,6 +439,7 @@ def main():
     """
     Entry point for the GUI
     """
+    multiprocessing.freeze_support()
     root = tk.Tk()
     RSVGui( root )
     root.mainloop()
@@ -0,0 +1,369 @@
+# Copyright Notice:
+# Copyright 2016-2020 DMTF. All rights reserved.
+# License: BSD 3-Clause License. For full text see link: https://github.com/DMTF/Redfish-Service-Validator/blob/master/LICENSE.md
+
+import asyncio
+import ssl
+from datetime import datetime
+from urllib.parse import urlparse
+
+import redfish as rf
+
+import redfish_service_validator.traverse as traverse
+import redfish_service_validator.validateResource as validateResource
+
+import logging
+my_logger = logging.getLogger(__name__)
+
+
+class HostPool:
+    """
+    Keep-alive HTTP/1.1 connections to one host
+
+    Requests wait for one of a limited number of connections, so the host never sees more than that many at once
+    """
+    def __init__(self, scheme, host, port, connections, timeout, ssl_context=None):
+        self.scheme, self.host, self.port = scheme, host, port
+        self.timeout, self.ssl_context = timeout, ssl_context
+        self.semaphore = asyncio.Semaphore(connections)
+        self.idle = []
+        self.opened = 0
+
+    async def connect(self):
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(
+            self.host, self.port, ssl=self.ssl_context if self.scheme == 'https' else None), self.timeout)
+        self.opened += 1
+        return reader, writer
+
+    async def request(self, method, target, headers):
+        """
+        Makes a request over an idle connection, or a new one
+
+        :param method: HTTP method
+        :param target: path and query of the request
+        :param headers: dict of request headers
+        :return: status, list of response headers, body as bytes
+        """
+        async with self.semaphore:
+            connection = self.idle.pop() if self.idle else None
+            reused = connection is not None
+            if connection is None:
+                connection = await self.connect()
+            try:
+                status, response_headers, body, keep_alive = await asyncio.wait_for(
+                    self.exchange(connection, method, target, headers), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError) as e:
+                connection[1].close()
+                if not reused:
+                    raise
+                # the host may have closed an idle connection in the meantime
+                my_logger.debug('Connection to {} closed, reconnecting: {}'.format(self.host, repr(e)))
+                connection = await self.connect()
+                try:
+                    status, response_headers, body, keep_alive = await asyncio.wait_for(
+                        self.exchange(connection, method, target, headers), self.timeout)
+                except BaseException:
+                    connection[1].close()
+                    raise
+            except BaseException:
+                connection[1].close()
+                raise
+            if keep_alive:
+                self.idle.append(connection)
+            else:
+                connection[1].close()
+            return status, response_headers, body
+
+    async def exchange(self, connection, method, target, headers):
+        reader, writer = connection
+        host = self.host if self.port in [80, 443] else '{}:{}'.format(self.host, self.port)
+        lines = ['{} {} HTTP/1.1'.format(method, target), 'Host: {}'.format(host)]
+        lines.extend('{}: {}'.format(x, y) for x, y in headers.items())
+        lines.append('Connection: keep-alive')
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError('Connection closed before a response')
+        version, status = status_line.decode('latin-1').split(None, 2)[:2]
+        status = int(status)
+
+        response_headers = []
+        while True:
+            line = await reader.readline()
+            if line in [b'\r\n', b'\n']:
+                break
+            if not line:
+                raise ConnectionError('Connection closed in the headers of a response')
+            name, value = line.decode('latin-1').split(':', 1)
+            response_headers.append((name.strip(), value.strip()))
+        header_dict = {x.lower(): y for x, y in response_headers}
+
+        connection_header = header_dict.get('connection', '').lower()
+        keep_alive = connection_header != 'close' if version == 'HTTP/1.1' else connection_header == 'keep-alive'
+
+        if method == 'HEAD' or status in [204, 304] or status < 200:
+            body = b''
+        elif 'chunked' in header_dict.get('transfer-encoding', '').lower():
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    # trailers, if any
+                    while (await reader.readline()) not in [b'\r\n', b'\n', b'']:
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            body = b''.join(chunks)
+        elif 'content-length' in header_dict:
+            body = await reader.readexactly(int(header_dict['content-length']))
+        else:
+            body = await reader.read()
+            keep_alive = False
+        return status, response_headers, body, keep_alive
+
+    def close(self):
+        for reader, writer in self.idle:
+            writer.close()
+        self.idle = []
+
+
+class AsyncHTTPClient:
+    """
+    HTTP/1.1 client for an asyncio event loop, with a pool of keep-alive connections per host
+    """
+    def __init__(self, connections=4, timeout=10, verify=False):
+        self.connections, self.timeout = connections, timeout
+        self.ssl_context = ssl.create_default_context()
+        if not verify:
+            self.ssl_context.check_hostname = False
+            self.ssl_context.verify_mode = ssl.CERT_NONE
+        self.pools = {}
+
+    def getPool(self, url):
+        parsed = urlparse(url)
+        port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+        key = (parsed.scheme, parsed.hostname, port)
+        if key not in self.pools:
+            self.pools[key] = HostPool(parsed.scheme, parsed.hostname, port, self.connections, self.timeout, self.ssl_context)
+        return self.pools[key]
+
+    async def get(self, url, headers):
+        """
+        Gets a URL
+
+        :param url: full URL
+        :param headers: dict of request headers
+        :return: StaticRestResponse, as the redfish library returns
+        """
+        parsed = urlparse(url)
+        target = parsed.path + ('?' + parsed.query if parsed.query else '')
+        status, response_headers, body = await self.getPool(url).request('GET', target or '/', headers)
+        return rf.rest.v1.StaticRestResponse(Status=status, Headers=response_headers, Content=body.decode('utf-8', 'ignore'))
+
+    def close(self):
+        for pool in self.pools.values():
+            pool.close()
+        self.pools = {}
+
+
+class AsyncPrefetcher:
+    """
+    Requests resources of the service ahead of the validation, as tasks of an event loop
+
+    Used by rfService as its Prefetcher, while the validation runs in a thread of its own; every request goes
+    through the connections of the event loop, so the validation waits for its responses without blocking
+    the loop and the other services on it; as with Prefetcher, responses the validation never gets to are
+    dropped, oldest first, once more than a limited number of them are kept
+    """
+    def __init__(self, context, client, loop, limit=64):
+        self.context, self.client, self.loop = context, client, loop
+        self.base_url = context.get_base_url().rstrip('/')
+        self.tasks = {}
+        self.limit = limit
+        self.requested, self.used, self.dropped = 0, 0, 0
+
+    def getHeaders(self, headers):
+        headers = dict(headers)
+        if self.context.get_session_key():
+            headers['X-Auth-Token'] = self.context.get_session_key()
+        elif self.context.get_authorization_key():
+            headers['Authorization'] = self.context.get_authorization_key()
+        headers.setdefault('Accept', '*/*')
+        headers.setdefault('OData-Version', '4.0')
+        return headers
+
+    async def request(self, URLDest, headers):
+        startTick = datetime.now()
+        response = await self.client.get(self.base_url + URLDest, self.getHeaders(headers))
+        return response, datetime.now() - startTick
+
+    def onLoop(self):
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    @staticmethod
+    def collectException(task):
+        # retrieved, so a failed request that is never used is not reported as unhandled
+        if not task.cancelled() and task.exception() is not None:
+            my_logger.debug('Prefetched request failed: {}'.format(repr(task.exception())))
+
+    def startTask(self, URLDest, headers):
+        task = self.loop.create_task(self.request(URLDest, headers))
+        task.add_done_callback(self.collectException)
+        return task
+
+    def start(self, URLDest, headers):
+        if URLDest in self.tasks:
+            return
+        while len(self.tasks) >= self.limit:
+            self.tasks.pop(next(iter(self.tasks))).cancel()
+            self.dropped += 1
+        self.tasks[URLDest] = self.startTask(URLDest, headers)
+        self.requested += 1
+
+    def prefetch(self, URLDest, headers):
+        """
+        Starts the request of a URL, unless it is already in flight
+        """
+        if self.onLoop():
+            self.start(URLDest, headers)
+        else:
+            self.loop.call_soon_threadsafe(self.start, URLDest, dict(headers))
+
+    async def wait(self, URLDests):
+        """
+        Waits for the requests of URLs, if they were prefetched
+        """
+        tasks = [self.tasks[x] for x in URLDests if x in self.tasks]
+        if tasks:
+            await asyncio.wait(tasks)
+
+    async def fetch(self, URLDest, headers):
+        task = self.tasks.pop(URLDest, None)
+        if task is not None:
+            try:
+                result = await task
+                self.used += 1
+                return result
+            except (ConnectionError, OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                my_logger.debug('Prefetched request of {} failed, requesting it again: {}'.format(URLDest, repr(e)))
+        return await self.startTask(URLDest, headers)
+
+    def get(self, URLDest, headers):
+        """
+        Returns the response of a URL and the time it took, waiting for its prefetched request if there is one
+
+        Called from the thread of the validation, which waits while the event loop goes on
+        """
+        if self.onLoop():
+            raise RuntimeError('Validation must run outside of the event loop, as it waits for responses of {}'.format(URLDest))
+        return asyncio.run_coroutine_threadsafe(self.fetch(URLDest, dict(headers)), self.loop).result()
+
+    def close(self):
+        for task in self.tasks.values():
+            task.cancel()
+        self.tasks = {}
+        self.client.close()
+
+
+def getPayloadLinks(payload):
+    """
+    Finds the URIs a payload links to, without its schema
+
+    :param payload: decoded JSON payload
+    :return: list of @odata.id values, in document order
+    """
+    links = []
+    if isinstance(payload, dict):
+        for key, value in payload.items():
+            if key == '@odata.id' and isinstance(value, str):
+                links.append(value)
+            else:
+                links.extend(getPayloadLinks(value))
+    elif isinstance(payload, list):
+        for value in payload:
+            links.extend(getPayloadLinks(value))
+    return links
+
+
+class AsyncService:
+    """
+    Validates resources of a service from an asyncio event loop
+
+    Its requests are multiplexed over a few keep-alive connections, so that many services can be
+    validated at once from a single event loop; the validation itself runs in a worker thread,
+    which waits for its responses while the loop serves the other services
+    """
+    def __init__(self, config, connections=4, loop=None):
+        """Init
+
+        Sets up an rfService, which logs in and gets $metadata and the ServiceRoot through the redfish library
+
+        Args:
+            config (dict): Configuration, as for rfService
+            connections (int): Connections to the service, and requests in flight to it at once
+            loop (asyncio.AbstractEventLoop, optional): Event loop making the requests. Defaults to the running loop.
+        """
+        self.service = traverse.rfService(config)
+        if self.service.prefetcher is not None:
+            self.service.prefetcher.close()
+            self.service.prefetcher = None
+        if config.get('offline', False):
+            return
+        if config.get('serv_http_proxy', '') != '' or config.get('serv_https_proxy', '') != '':
+            my_logger.warning('Requests through a proxy are not multiplexed, using the redfish library instead')
+        else:
+            client = AsyncHTTPClient(connections, config['timeout'], config['certificatecheck'])
+            self.service.prefetcher = AsyncPrefetcher(self.service.context, client, loop or asyncio.get_running_loop())
+
+    @classmethod
+    async def create(cls, config, connections=4):
+        """
+        Sets up a service without blocking the event loop
+        """
+        return await asyncio.to_thread(cls, config, connections, asyncio.get_running_loop())
+
+    @property
+    def config(self):
+        return self.service.config
+
+    async def fetchURIs(self, URILinks):
+        """
+        Requests the resources of URIs and waits for them to arrive
+
+        param arg1: list of paths to URIs
+        """
+        self.service.prefetchURIs(URILinks)
+        if self.service.prefetcher is not None:
+            await self.service.prefetcher.wait([urlparse(x.rsplit('#', 1)[0]).path for x in URILinks if x is not None])
+
+    async def callResourceURI(self, URILink):
+        """
+        Makes a call to a given URI or URL, unless its result is already cached
+
+        param arg1: path to URI "/example/1", or URL "http://example.com"
+        return: (success boolean, data, request status code)
+        """
+        await self.fetchURIs([URILink])
+        return await asyncio.to_thread(self.service.callResourceURI, URILink)
+
+    async def validateSingleURI(self, URI, uriName='', expectedType=None, expectedJson=None, parent=None):
+        """
+        Validates a resource, after requesting it and the resources it links to
+
+        return: as validateResource.validateSingleURI
+        """
+        if expectedJson is None:
+            success, data, _, _ = await self.callResourceURI(URI)
+            if success:
+                await self.fetchURIs(getPayloadLinks(data))
+        # in a thread, as the validation waits for the responses of the links it follows
+        return await asyncio.to_thread(validateResource.validateSingleURI, self.service, URI, uriName, expectedType, expectedJson, parent)
+
+    def close(self):
+        self.service.close()
@@ -0,0 +1,106 @@
+# Copyright Notice:
+# Copyright 2016-2020 DMTF. All rights reserved.
+# License: BSD 3-Clause License. For full text see link: https://github.com/DMTF/Redfish-Service-Validator/blob/master/LICENSE.md
+
+from collections import OrderedDict
+
+import logging
+my_logger = logging.getLogger(__name__)
+
+
+def getResponseSize(result):
+    """
+    Get the size of a result of callResourceURI, as the length of its response body
+
+    :param result: tuple of success, data, response and elapsed time
+    :return: size in bytes
+    """
+    response = result[2]
+    body = getattr(response, 'read', None)
+    return len(body) if isinstance(body, (str, bytes)) else 0
+
+
+class ResponseCache:
+    """
+    Results of callResourceURI by URI, bounded by the total size of their responses
+
+    The least recently used results are evicted once the size passes its limit, unless they are pinned
+    """
+
+    def __init__(self, max_bytes):
+        """Init
+
+        Args:
+            max_bytes (int): Total size of the responses kept, not counting pinned ones
+        """
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.pinned = {}
+        self.size = 0
+        self.hits, self.misses, self.evictions = 0, 0, 0
+
+    def __contains__(self, uri):
+        return uri in self.entries or uri in self.pinned
+
+    def __len__(self):
+        return len(self.entries) + len(self.pinned)
+
+    def get(self, uri):
+        """
+        Get the result of an URI, and count it as a hit or a miss
+
+        :param uri: URI as requested
+        :return: result, or None if it is not cached
+        """
+        if uri in self.pinned:
+            self.hits += 1
+            return self.pinned[uri][0]
+        if uri in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(uri)
+            return self.entries[uri][0]
+        self.misses += 1
+        return None
+
+    def put(self, uri, result, pinned=False):
+        """
+        Store the result of an URI, evicting the least recently used results if needed
+
+        :param uri: URI as requested
+        :param result: tuple of success, data, response and elapsed time
+        :param pinned: Keep the result for the whole run
+        """
+        self.discard(uri)
+        size = getResponseSize(result)
+        if pinned:
+            self.pinned[uri] = (result, size)
+            return
+        if size > self.max_bytes:
+            my_logger.debug('Response of {} is too large to be cached ({} bytes)'.format(uri, size))
+            return
+        self.entries[uri] = (result, size)
+        self.size += size
+        while self.size > self.max_bytes:
+            old_uri, (_, old_size) = self.entries.popitem(last=False)
+            self.size -= old_size
+            self.evictions += 1
+            my_logger.debug('Evicted response of {} from cache'.format(old_uri))
+
+    def discard(self, uri):
+        """
+        Remove the result of an URI, if it is cached
+
+        :param uri: URI as requested
+        """
+        if uri in self.entries:
+            self.size -= self.entries.pop(uri)[1]
+        self.pinned.pop(uri, None)
+
+    def getStats(self):
+        """
+        Get a summary of the use of the cache, for the log
+
+        :return: string
+        """
+        return '{} hits, {} misses, {} evictions; {} responses of {} bytes kept, {} pinned'.format(
+            self.hits, self.misses, self.evictions, len(self), self.size + sum(x[1] for x in self.pinned.values()), len(self.pinned))
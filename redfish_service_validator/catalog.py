@@ -1,11 +1,20 @@
-import glob, copy, difflib
+import glob, difflib
+import hashlib
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+import json
 import logging
+import os
 import re
+import sys
 from collections import namedtuple
+from collections.abc import MutableMapping
 from enum import Enum, auto
+from io import BytesIO
 from os import path
+from types import MappingProxyType
 
-from bs4 import BeautifulSoup
+from lxml import etree
 
 from redfish_service_validator.helper import (
     getNamespace,
@@ -17,6 +26,10 @@ from redfish_service_validator.helper import (
 
 includeTuple = namedtuple("include", ["Namespace", "Uri"])
 
+TypeFacts = namedtuple("TypeFacts", ["HasAdditional", "Capabilities", "DynamicProperties", "Uris"])
+
+TypeValidator = namedtuple("TypeValidator", ["Pattern", "Minimum", "Maximum", "Enumeration"])
+
 my_logger = logging.getLogger(__name__)
 
 REDFISH_ABSENT = "n/a"
@@ -25,6 +38,12 @@ URI_ID_REGEX = '\{[A-Za-z0-9]*Id\}'
 
 VALID_ID_REGEX = '([A-Za-z0-9.!#$&-;=?\[\]_~])+'
 
+DATETIME_REGEX = re.compile(r".*(Z|(\+|-)[0-9][0-9]:[0-9][0-9])")
+
+DURATION_REGEX = re.compile(r"P([0-9]+D)?(T([0-9]+H)?([0-9]+M)?([0-9]+(\.[0-9]+)?S)?)?")
+
+GUID_REGEX = re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
+
 # Excerpt definitions
 class ExcerptTypes(Enum):
     NEUTRAL = auto()
@@ -40,6 +59,10 @@ excerpt_info_by_type = {
 
 allowed_annotations = ['odata', 'Redfish', 'Privileges', 'Message']
 
+# Annotations read into the TypeFacts of a RedfishType
+fact_terms = ['OData.AdditionalProperties', 'Capabilities.InsertRestrictions', 'Capabilities.UpdateRestrictions',
+              'Capabilities.DeleteRestrictions', 'Redfish.DynamicPropertyPatterns', 'Redfish.Uris']
+
 def get_fuzzy_property(prop_name: str, jsondata: dict, allPropList=[]):
     """
     Get property closest to the discovered property.
@@ -64,6 +87,391 @@ def get_fuzzy_property(prop_name: str, jsondata: dict, allPropList=[]):
     return prop_name
 
 
+class SchemaElement:
+    """
+    Lightweight CSDL element.
+
+    Holds the tag name, attributes, child elements and text of a parsed schema element.
+    Supports a small Tag-like interface used by the catalog (get, [], find, find_all, contents),
+    and can be serialized to plain lists for the on-disk catalog cache.
+    """
+
+    __slots__ = ('name', 'attrs', 'children', 'text')
+
+    def __init__(self, name, attrs=None, children=(), text=None):
+        self.name = name
+        self.attrs = attrs if attrs is not None else {}
+        self.children = tuple(children)
+        self.text = text
+
+    def __repr__(self):
+        return '<{} {}>'.format(self.name, ' '.join('{}="{}"'.format(x, y) for x, y in self.attrs.items()))
+
+    def __bool__(self):
+        return True
+
+    def __getitem__(self, key):
+        return self.attrs[key]
+
+    def get(self, key, default=None):
+        return self.attrs.get(key, default)
+
+    @property
+    def contents(self):
+        return [self.text] if self.text is not None else list(self.children)
+
+    @property
+    def string(self):
+        return self.text
+
+    def _matches(self, name, attrs):
+        if name is not None:
+            if isinstance(name, str):
+                if self.name != name:
+                    return False
+            elif self.name not in name:
+                return False
+        for key, value in attrs.items():
+            if self.attrs.get(key) != value:
+                return False
+        return True
+
+    def _iter(self, recursive):
+        for child in self.children:
+            yield child
+            if recursive:
+                yield from child._iter(recursive)
+
+    def find_all(self, name=None, attrs={}, recursive=True, **kwargs):
+        """
+        Get all child elements matching the tag name(s) and attributes
+
+        :param name: Tag name or list of tag names, None for any
+        :param attrs: Dictionary of attributes to match
+        :param recursive: Search all descendants instead of only direct children
+        :return: list of SchemaElement
+        """
+        attrs = {**attrs, **kwargs}
+        return [x for x in self._iter(recursive) if x._matches(name, attrs)]
+
+    def find(self, name=None, attrs={}, recursive=True, **kwargs):
+        """
+        Get the first child element matching the tag name(s) and attributes, or None
+        """
+        attrs = {**attrs, **kwargs}
+        for x in self._iter(recursive):
+            if x._matches(name, attrs):
+                return x
+        return None
+
+    def to_json(self):
+        return [self.name, self.attrs, [x.to_json() for x in self.children], self.text]
+
+    @classmethod
+    def from_json(cls, data):
+        name, attrs, children, text = data
+        return cls(name, attrs, [cls.from_json(x) for x in children], text)
+
+
+
+# Annotations only meant for human readers, dropped when compiling documents
+documentation_terms = ['OData.Description', 'OData.LongDescription']
+
+
+def compile_schema_document(data):
+    """
+    Parse the text of a CSDL document into SchemaElements
+
+    Streams the document with lxml, building each element as it is closed and freeing the parsed XML behind it.
+
+    :param data: text of CSDL document
+    :return: Edmx element of document
+    :rtype: SchemaElement
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    stack = [[]]
+    for event, elem in etree.iterparse(BytesIO(data), events=('start', 'end'), remove_comments=True, remove_pis=True):
+        if event == 'start':
+            stack.append([])
+            continue
+        children = stack.pop()
+        name = sys.intern(etree.QName(elem).localname)
+        if name == 'Annotation' and elem.get('Term') in documentation_terms:
+            pass
+        else:
+            attrs = {sys.intern(x): y for x, y in elem.attrib.items()}
+            text = elem.text if len(elem) == 0 else None
+            stack[-1].append(SchemaElement(name, attrs, children, text))
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+    edmxTag = stack[0][0] if stack[0] else None
+    if edmxTag is None or edmxTag.name != 'Edmx':
+        raise ValueError('Document has no Edmx element')
+    return edmxTag
+
+
+def compile_schema_file(filename):
+    """
+    Parse a schema file, as done by the worker processes of a parallel catalog build
+
+    :param filename: path of schema file
+    :return: SHA-256 digest of the file, compiled document as plain lists (see SchemaElement.to_json)
+    :rtype: tuple
+    """
+    with open(filename, 'rb') as f:
+        data = f.read()
+    return hashlib.sha256(data).hexdigest(), compile_schema_document(data).to_json()
+
+
+def compile_schema_files(filenames, jobs):
+    """
+    Parse schema files across a pool of processes
+
+    :param filenames: paths of schema files
+    :param jobs: number of worker processes
+    :return: dictionary of file names to their digest and Edmx element
+    :rtype: dict
+    """
+    compiled = {}
+    try:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            chunksize = max(1, len(filenames) // (jobs * 4))
+            for filename, (digest, data) in zip(filenames, executor.map(compile_schema_file, filenames, chunksize=chunksize)):
+                compiled[path.split(filename)[-1]] = (digest, SchemaElement.from_json(data))
+    except Exception as e:
+        my_logger.warning('Parallel schema parsing failed, parsing remaining files serially: {}'.format(repr(e)))
+    return compiled
+
+
+def index_schema_document(edmx):
+    """
+    Get the namespaces and aliases declared in a compiled CSDL document
+
+    :param edmx: Edmx element of document
+    :return: list of Schema namespaces, dictionary of aliases to namespaces
+    """
+    namespaces, aliases = [], {}
+    for ref in edmx.find_all("Reference", recursive=False):
+        for item in ref.find_all("Include", recursive=False):
+            ns, alias = item.get("Namespace"), item.get("Alias")
+            if ns is not None and alias is not None and ref.get("Uri") is not None:
+                aliases[alias] = ns
+    parentTag = edmx.find("DataServices", recursive=False)
+    if parentTag is not None:
+        namespaces = [x["Namespace"] for x in parentTag.find_all("Schema", recursive=False)]
+    return namespaces, aliases
+
+
+def scan_schema_file(filename):
+    """
+    Get the namespaces and aliases declared in a CSDL file, without parsing it
+
+    :param filename: path of schema file
+    :return: list of Schema namespaces, dictionary of aliases to namespaces
+    """
+    with open(filename) as f:
+        data = f.read()
+    namespaces = re.findall(r'<(?:\w+:)?Schema\b[^>]*\bNamespace="([^"]+)"', data)
+    aliases = {}
+    for attrs in re.findall(r'<(?:\w+:)?Include\b([^>]*)>', data):
+        attrs = dict(re.findall(r'(\w+)="([^"]*)"', attrs))
+        if 'Namespace' in attrs and 'Alias' in attrs:
+            aliases[attrs['Alias']] = attrs['Namespace']
+    return namespaces, aliases
+
+
+class SchemaCatalogCache:
+    """
+    Compiled form of the schema files of a directory, stored next to them.
+
+    Every schema file is stored as its compiled SchemaElement tree in the cache directory,
+    and is checked against the size and modification time of its file, then against the hash of its content,
+    so only changed or new files need to be parsed again.
+    The index also holds the namespaces and aliases of every file, so a catalog can be indexed without reading any tree.
+    """
+
+    cache_dir_name = '.catalog_cache'
+    cache_version = 3
+
+    def __init__(self, filepath: str):
+        self.cache_dir = path.join(filepath, SchemaCatalogCache.cache_dir_name)
+        self.index_file = path.join(self.cache_dir, 'index.json')
+        self.files = {}
+        self.modified = False
+        self.hits, self.misses = 0, 0
+        try:
+            with open(self.index_file) as f:
+                index = json.load(f)
+            if index.get('version') == SchemaCatalogCache.cache_version:
+                self.files = index.get('files', {})
+            else:
+                my_logger.debug('Schema catalog cache version differs, ignoring {}'.format(self.index_file))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            my_logger.debug('Could not read schema catalog cache {}: {}'.format(self.index_file, repr(e)))
+
+    def _entry_file(self, name):
+        return path.join(self.cache_dir, name + '.json')
+
+    def lookup(self, filename):
+        """
+        Get cache entry of a schema file, if the file hasn't changed since it was stored
+
+        :param filename: path of schema file
+        :return: entry with namespaces and aliases of the file, or None
+        :rtype: dict
+        """
+        name = path.split(filename)[-1]
+        entry = self.files.get(name)
+        if entry is None:
+            return None
+        stat = os.stat(filename)
+        if entry['mtime'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            return entry
+        with open(filename, 'rb') as f:
+            data = f.read()
+        if entry['digest'] == hashlib.sha256(data).hexdigest():
+            entry['mtime'], entry['size'] = stat.st_mtime_ns, stat.st_size
+            self.modified = True
+            return entry
+        return None
+
+    def load(self, filename):
+        """
+        Get compiled document of a schema file, parsing the file again if it has changed
+
+        :param filename: path of schema file
+        :return: Edmx element of document
+        :rtype: SchemaElement
+        """
+        name = path.split(filename)[-1]
+        if self.lookup(filename) is not None:
+            edmx = self._load_entry(name)
+            if edmx is not None:
+                self.hits += 1
+                return edmx
+        return self.compile(filename)
+
+    def compile(self, filename, compiled=None):
+        """
+        Parse a schema file and store its compiled document
+
+        :param filename: path of schema file
+        :param compiled: digest and Edmx element of the file, if it was already parsed
+        :return: Edmx element of document
+        :rtype: SchemaElement
+        """
+        name = path.split(filename)[-1]
+        stat = os.stat(filename)
+        if compiled is not None:
+            digest, edmx = compiled
+        else:
+            with open(filename, 'rb') as f:
+                data = f.read()
+            digest, edmx = hashlib.sha256(data).hexdigest(), compile_schema_document(data)
+        self.store(name, digest, stat, edmx)
+        self.misses += 1
+        return edmx
+
+    def _load_entry(self, name):
+        try:
+            with open(self._entry_file(name)) as f:
+                return SchemaElement.from_json(json.load(f))
+        except Exception as e:
+            my_logger.debug('Could not read cached schema {}: {}'.format(name, repr(e)))
+            return None
+
+    def store(self, name, digest, stat, edmx):
+        """
+        Store compiled document of a schema file
+
+        :param name: file name of schema
+        :param digest: SHA-256 digest of schema file
+        :param stat: os.stat_result of schema file
+        :param edmx: compiled document
+        """
+        namespaces, aliases = index_schema_document(edmx)
+        self.files[name] = {'mtime': stat.st_mtime_ns, 'size': stat.st_size, 'digest': digest,
+                            'namespaces': namespaces, 'aliases': aliases}
+        self.modified = True
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # written aside first, as other validations may read the cache at the same time
+            tmp_file = '{}.{}.tmp'.format(self._entry_file(name), os.getpid())
+            with open(tmp_file, 'w') as f:
+                json.dump(edmx.to_json(), f, separators=(',', ':'))
+            os.replace(tmp_file, self._entry_file(name))
+        except Exception as e:
+            my_logger.debug('Could not write cached schema {}: {}'.format(name, repr(e)))
+            self.files.pop(name, None)
+
+    def prune(self, names):
+        """
+        Remove files from cache that are not in the given file names
+        """
+        for name in [x for x in self.files if x not in names]:
+            del self.files[name]
+            self.modified = True
+            try:
+                os.remove(self._entry_file(name))
+            except OSError:
+                pass
+
+    def save(self):
+        """
+        Write cache index to disk, if it has been modified
+        """
+        if not self.modified:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_file = '{}.{}.tmp'.format(self.index_file, os.getpid())
+            with open(tmp_file, 'w') as f:
+                json.dump({'version': SchemaCatalogCache.cache_version, 'files': self.files}, f)
+            os.replace(tmp_file, self.index_file)
+            self.modified = False
+        except Exception as e:
+            my_logger.warning('Could not write schema catalog cache {}: {}'.format(self.index_file, repr(e)))
+
+
+UriMatch = namedtuple("UriMatch", ["Uri", "Id"])
+
+
+class UriMatcher:
+    """
+    Matches a URI against the Redfish.Uris of a type with a single compiled pattern
+    """
+
+    def __init__(self, uris):
+        """Init
+
+        Args:
+            uris (list): Redfish.Uris templates, in the order they are annotated
+        """
+        self.uris = tuple(uris)
+        # an Id is only expected when the last segment of a template is an Id parameter
+        self.expects_id = tuple(re.match(URI_ID_REGEX, x.rsplit('/')[-1]) is not None for x in self.uris)
+        self.regex = re.compile('|'.join('(?P<uri{}>{})'.format(n, re.sub(URI_ID_REGEX, VALID_ID_REGEX, x)) for n, x in enumerate(self.uris)))
+
+    def match(self, uri):
+        """
+        Returns the first template matching the uri, and the Id segment the uri gives if that template expects one
+
+        :param uri: @odata.id value, without trailing slash
+        :type uri: str
+        :return: Matching template and Id segment, or None if no template matches
+        :rtype: UriMatch
+        """
+        my_match = self.regex.fullmatch(uri)
+        if my_match is None:
+            return None
+        n = int(my_match.lastgroup[3:])
+        return UriMatch(self.uris[n], uri.split('/')[-1] if self.expects_id[n] else None)
+
+
 class MissingSchemaError(Exception):
     """
     Missing Schema Error.
@@ -81,38 +489,135 @@ class SchemaCatalog:
     From Catalog, you can get any Schema by it's filename, or its classes
     """
 
-    def __init__(self, filepath: str, metadata: object = None):
+    def __init__(self, filepath: str, metadata: object = None, use_cache: bool = False, lazy: bool = False, jobs: int = 1):
         """Init
 
         Args:
             filepath (str): Directory of metadata
             metadata (object, optional): Preestablished metadata. Defaults to None.
+            use_cache (bool, optional): Use and update compiled schema files stored in the directory. Defaults to False.
+            lazy (bool, optional): Only index the namespaces of each file, and create its SchemaDoc when first requested. Defaults to False.
+            jobs (int, optional): Number of processes parsing schema files that need to be parsed. Defaults to 1.
         """
         self.filepath = filepath
         self.alias = {}
         self.catalog = {}
         self.catalog_by_class = {}
+        self.files = {}
+        self.lazy = lazy
+        self.generation = 0
+        self.type_versions = {}
         self.flags = {
             'ignore_uri_checks': False
         }
         my_logger.debug("Creating Schema catalog from filepath {}".format(filepath))
 
-        # create SchemaDoc objects
-        for x in glob.glob(path.join(filepath, "*")):
-            with open(x) as f:
-                my_name = path.split(x)[-1]
-                schema = SchemaDoc(f.read(), self, my_name)
-                self.catalog[my_name] = schema
+        self.cache = cache = SchemaCatalogCache(filepath) if use_cache else None
 
-            base_names = [getNamespaceUnversioned(x) for x in schema.classes if getNamespaceUnversioned(x) not in schema.classes]
-            for item in list(schema.classes.keys()) + base_names:
+        all_files = glob.glob(path.join(filepath, "*"))
+        for x in all_files:
+            self.files[path.split(x)[-1]] = x
+
+        # parse files that are needed now in parallel, if asked
+        self.compiled = {}
+        if jobs > 1:
+            if cache is not None:
+                my_files = [x for x in all_files if cache.lookup(x) is None]
+            else:
+                my_files = all_files if not lazy else []
+            if len(my_files) > 1:
+                my_logger.debug('Parsing {} schema files with {} processes'.format(len(my_files), jobs))
+                self.compiled = compile_schema_files(my_files, jobs)
+
+        # index files by their namespaces, creating SchemaDoc objects unless lazy
+        all_aliases = []
+        for x in all_files:
+            my_name = path.split(x)[-1]
+            if not lazy:
+                schema = self.getSchemaDoc(my_name)
+                namespaces, aliases = list(schema.classes), schema.alias
+            elif cache is not None:
+                entry = cache.lookup(x)
+                if entry is not None:
+                    namespaces, aliases = entry['namespaces'], entry['aliases']
+                else:
+                    namespaces, aliases = index_schema_document(cache.compile(x, self.compiled.pop(my_name, None)))
+            else:
+                namespaces, aliases = scan_schema_file(x)
+            all_aliases.append(aliases)
+
+            base_names = [getNamespaceUnversioned(x) for x in namespaces if getNamespaceUnversioned(x) not in namespaces]
+            for item in namespaces + base_names:
                 if item not in self.catalog_by_class:
-                    self.catalog_by_class[item] = [schema]
+                    self.catalog_by_class[item] = [my_name]
                 else:
-                    self.catalog_by_class[item].append(schema)
+                    self.catalog_by_class[item].append(my_name)
         
-        for _, schema in self.catalog.items():
-            self.alias.update(schema.alias)
+        for aliases in all_aliases:
+            self.alias.update(aliases)
+
+        if cache is not None:
+            cache.prune(self.files)
+            cache.save()
+            my_logger.debug('Schema catalog cache: {} loaded, {} parsed'.format(cache.hits, cache.misses))
+
+    def getFingerprint(self):
+        """
+        Get a digest of the schema files of the catalog, which changes along with any of them
+
+        :return: SHA-256 digest
+        :rtype: str
+        """
+        fingerprint = hashlib.sha256()
+        for name in sorted(self.files):
+            filename = self.files[name]
+            if not path.isfile(filename):
+                continue
+            entry = self.cache.lookup(filename) if self.cache is not None else None
+            if entry is not None:
+                digest = entry['digest']
+            else:
+                with open(filename, 'rb') as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()
+            fingerprint.update('{}:{}\n'.format(name, digest).encode())
+        return fingerprint.hexdigest()
+
+    def invalidate(self):
+        """
+        Marks the type trees, properties and facts resolved by each RedfishType as stale
+
+        Must be called after changing the files or aliases of the catalog
+        """
+        self.generation += 1
+        self.type_versions = {}
+
+    def getSchemaDoc(self, name):
+        """
+        Get Document by file name, creating it if it has not been yet
+
+        :param name: file name of schema
+        :type name: str
+        :raises MissingSchemaError: Missing schema in Catalog
+        :return: Schema Document
+        :rtype: SchemaDoc
+        """
+        if name not in self.catalog:
+            if name not in self.files:
+                raise MissingSchemaError("Could not find any Schema file named {}".format(name))
+            filename = self.files[name]
+            compiled = self.compiled.pop(name, None)
+            if self.cache is not None and compiled is not None:
+                self.catalog[name] = SchemaDoc(self.cache.compile(filename, compiled), self, name)
+            elif compiled is not None:
+                self.catalog[name] = SchemaDoc(compiled[1], self, name)
+            elif self.cache is not None:
+                self.catalog[name] = SchemaDoc(self.cache.load(filename), self, name)
+            else:
+                with open(filename) as f:
+                    self.catalog[name] = SchemaDoc(f.read(), self, name)
+            if self.lazy:
+                my_logger.debug('Created SchemaDoc for {} on first request'.format(name))
+        return self.catalog[name]
 
     def getSchemaDocByClass(self, typename):
         """
@@ -129,10 +634,53 @@ class SchemaCatalog:
         typename = getNamespaceUnversioned(typename)
         typename = self.alias.get(typename, typename)
         if typename in self.catalog_by_class:
-            return self.catalog_by_class[typename][0]
+            return self.getSchemaDoc(self.catalog_by_class[typename][0])
         else:
             raise MissingSchemaError( "Could not find any Schema with these parameters {}".format(typename))
 
+    def getTypeVersions(self, namespace, typename):
+        """
+        Get the versions defining a type in the Schema Document of its namespace, indexed on first request
+
+        :param namespace: namespace of the type, versioned or not
+        :type namespace: str
+        :param typename: type name, without namespace
+        :type typename: str
+        :raises MissingSchemaError: Missing schema in Catalog
+        :return: versions in ascending order, and the namespace of each
+        :rtype: tuple
+        """
+        key = (getNamespaceUnversioned(namespace), typename)
+        if key not in self.type_versions:
+            my_doc = self.getSchemaDocByClass(namespace)
+            # sorting is stable, so equal versions stay in the order of the document
+            entries = sorted([(splitVersionString(ns), ns) for ns, schema in my_doc.classes.items() if typename in schema.my_types], key=lambda x: x[0])
+            self.type_versions[key] = ([x[0] for x in entries], [x[1] for x in entries])
+        return self.type_versions[key]
+
+    def getHighestTypeVersion(self, namespace, typename, limit=None, versioned=False):
+        """
+        Get the namespace of the highest version of a type, no higher than a limit
+
+        :param namespace: namespace of the type, versioned or not
+        :type namespace: str
+        :param typename: type name, without namespace
+        :type typename: str
+        :param limit: highest version allowed, as a namespace or version string
+        :type limit: str
+        :param versioned: skip unversioned namespaces
+        :type versioned: bool
+        :raises MissingSchemaError: Missing schema in Catalog
+        :return: namespace, or None if no version fits
+        :rtype: str
+        """
+        versions, namespaces = self.getTypeVersions(namespace, typename)
+        n = len(versions) if limit is None else bisect_right(versions, splitVersionString(limit))
+        for ns in reversed(namespaces[:n]):
+            if not versioned or getVersion(ns) is not None:
+                return ns
+        return None
+
     def getSchemaInCatalog(self, typename):
         """
         Get Schema by class
@@ -168,16 +716,23 @@ class SchemaCatalog:
 class SchemaDoc:
     """Represents a schema document."""
 
-    def __init__(self, data: str, catalog: SchemaCatalog = None, name: str = None):
+    def __init__(self, data, catalog: SchemaCatalog = None, name: str = None):
+        """Init
+
+        Args:
+            data (str or SchemaElement): Text of CSDL document, or its compiled Edmx element
+            catalog (SchemaCatalog, optional): Owning catalog. Defaults to None.
+            name (str, optional): File name of document. Defaults to None.
+        """
         # set up document
-        self.soup = BeautifulSoup(data, "xml")
+        edmxTag = data if isinstance(data, SchemaElement) else compile_schema_document(data)
+        self.edmx = edmxTag
         self.name = str(name)
         self.origin = "local"
         self.catalog = catalog
         self.classes = {}
         self.alias = {}
 
-        edmxTag = self.soup.find("Edmx", recursive=False)
         reftags = edmxTag.find_all("Reference", recursive=False)
         self.refs = {}
         for ref in reftags:
@@ -263,36 +818,52 @@ class SchemaDoc:
     
 
 class SchemaClass:
-    def __init__(self, soup, owner: SchemaDoc):
+    def __init__(self, element, owner: SchemaDoc):
         super().__init__()
         self.parent_doc = owner
         self.catalog = owner.catalog
-        self.class_soup = soup
-        self.class_name = soup["Namespace"]
+        self.class_element = element
+        self.class_name = element["Namespace"]
         self.entity_types, self.complex_types, self.enum_types, self.def_types = {}, {}, {}, {}
 
-        for x in self.class_soup.find_all(["EntityType"], recursive=False):
+        for x in self.class_element.find_all(["EntityType"], recursive=False):
             self.entity_types[x["Name"]] = RedfishType(x, self)
 
-        for x in self.class_soup.find_all(["ComplexType"], recursive=False):
+        for x in self.class_element.find_all(["ComplexType"], recursive=False):
             self.complex_types[x["Name"]] = RedfishType(x, self)
 
-        for x in self.class_soup.find_all(["EnumType"], recursive=False):
+        for x in self.class_element.find_all(["EnumType"], recursive=False):
             self.enum_types[x["Name"]] = RedfishType(x, self)
 
-        for x in self.class_soup.find_all(["TypeDefinition"], recursive=False):
+        for x in self.class_element.find_all(["TypeDefinition"], recursive=False):
             self.def_types[x["Name"]] = RedfishType(x, self)
         
         self.actions = {}
-        for x in self.class_soup.find_all(["Action"], recursive=False):
+        for x in self.class_element.find_all(["Action"], recursive=False):
             self.actions[x["Name"]] = x
 
         self.terms = {}
-        for x in self.class_soup.find_all(["Term"], recursive=False):
+        for x in self.class_element.find_all(["Term"], recursive=False):
             self.terms[x["Name"]] = RedfishType(x, self)
 
         self.my_types = {**self.entity_types, **self.complex_types, **self.enum_types, **self.def_types}
 
+        self.additional_terms = {}
+
+    def getAdditionalTerm(self, edm_type):
+        """
+        Get the type of additional properties of an Edm type, described by a Term of this schema created once
+
+        :param edm_type: Edm type of the additional properties
+        :type edm_type: str
+        :rtype: RedfishType
+        """
+        if edm_type not in self.additional_terms:
+            # Make a pseudo tag because RedfishType requires it, shared by all properties of this type
+            my_new_term = SchemaElement('Term', {'Name': getType(edm_type), 'Type': edm_type})
+            self.additional_terms[edm_type] = RedfishType(my_new_term, self)
+        return self.additional_terms[edm_type]
+
     def getHighestType(self, my_full_type, limit=None):
         """
         Get Highest possible version for given type.
@@ -300,7 +871,6 @@ class SchemaClass:
         :param acquiredtype: Type available
         :param limit: Version string limit (full namespace or just version 'v1_x_x')
         """
-        typelist = []
         my_type = getType(my_full_type)
 
         if limit is not None:
@@ -310,21 +880,11 @@ class SchemaClass:
             else:
                 limit = getVersion(limit)
 
-        for _, schema in self.parent_doc.classes.items():
-            newNamespace = schema.class_name
-            if limit is not None:
-                if getVersion(newNamespace) is None:
-                    continue
-                if splitVersionString(newNamespace) > splitVersionString(limit):
-                    continue
-            if (my_type in self.my_types):
-                typelist.append(splitVersionString(newNamespace))
-
-        if len(typelist) > 1:
-            for ns in reversed(sorted(typelist)):
-                my_logger.debug("{}   {}".format(ns, getType(my_type)))
-                my_type = getNamespaceUnversioned(my_full_type) + ".v{}_{}_{}".format(*ns) + "." + getType(my_full_type)
-                return my_type
+        my_namespace = self.catalog.getHighestTypeVersion(self.class_name, my_type, limit, versioned=True)
+        if my_namespace is not None:
+            ns = splitVersionString(my_namespace)
+            my_logger.debug("{}   {}".format(ns, my_type))
+            return getNamespaceUnversioned(my_full_type) + ".v{}_{}_{}".format(*ns) + "." + my_type
         return my_type
 
 
@@ -343,13 +903,13 @@ class RedfishType:
     def __repr__(self):
         return self.fulltype
     
-    def __init__(self, soup, owner: SchemaClass):
+    def __init__(self, element, owner: SchemaClass):
 
         self.owner = owner
         self.catalog = owner.catalog
 
-        self.type_soup = soup
-        self.tag_type = soup.name
+        self.type_element = element
+        self.tag_type = element.name
 
         if self.tag_type in ['NavigationProperty', 'Property', 'Term']:
             self.IsPropertyType = True
@@ -358,11 +918,11 @@ class RedfishType:
         else:
             self.IsPropertyType = False
             self.IsNav = False
-            self.fulltype = self.owner.class_name + '.' + soup['Name']
+            self.fulltype = self.owner.class_name + '.' + element['Name']
         self.Namespace, self.Type = getNamespace(self.fulltype), getType(self.fulltype)
 
         self.tags = {}
-        for tag in self.type_soup.find_all(recursive=False):
+        for tag in self.type_element.find_all(recursive=False):
             if(tag.get('Term')):
                 self.tags[tag['Term']] = tag.attrs
                 if (tag.get('Term') == 'Redfish.Revisions'):
@@ -371,7 +931,7 @@ class RedfishType:
         propPermissions = self.tags.get('OData.Permissions')
 
         self.IsMandatory = self.tags.get('Redfish.Required') is not None
-        self.IsNullable = self.type_soup.get("Nullable", "true") not in ["false", False, "False"]
+        self.IsNullable = self.type_element.get("Nullable", "true") not in ["false", False, "False"]
         self.AutoExpand = self.tags.get('OData.AutoExpand', None) is not None or self.tags.get('OData.AutoExpand'.lower(), None) is not None
         self.Deprecated = self.tags.get('Redfish.Deprecated')
         self.Revisions = self.tags.get('Redfish.Revisions')
@@ -392,9 +952,13 @@ class RedfishType:
 
         self.property_pattern = None
 
+        self._facts, self._local_facts = None, None
+        self._parent_types, self._all_properties, self._generation = None, None, None
+        self._uri_matcher, self._skeleton = None, None
+        self._required, self._members, self._validator = None, None, None
 
         # get properties
-        prop_tags = self.type_soup.find_all( ["NavigationProperty", "Property"], recursive=False)
+        prop_tags = self.type_element.find_all( ["NavigationProperty", "Property"], recursive=False)
     
         self.unique_properties = {}
 
@@ -404,83 +968,27 @@ class RedfishType:
     
     @property
     def HasAdditional(self):
-        my_parents = self.getTypeTree()
-        for my_type in my_parents:
-            if not isinstance(my_type, RedfishType): continue
-            if 'Bios' in str(my_type) and 'Attributes' in str(my_type):
-                return True
-            if my_type == 'MessageRegistry.v1_0_0.MessageProperty':
-                return True
-            additionalElement = my_type.type_soup.find("Annotation", attrs={"Term": "OData.AdditionalProperties"})
-            HasAdditional = ( False if additionalElement is None else (
-                    True if additionalElement.get("Bool", False) in ["True", "true", True]
-                    else False))
-            if HasAdditional: return True
-        return False
+        return self.getFacts().HasAdditional
 
     @property
     def CanUpdate(self):
-        return self.getCapabilities()['CanUpdate']
+        return self.getFacts().Capabilities['CanUpdate']
 
     @property
     def CanDelete(self):
-        return self.getCapabilities()['CanDelete']
+        return self.getFacts().Capabilities['CanDelete']
 
     @property
     def CanInsert(self):
-        return self.getCapabilities()['CanInsert']
+        return self.getFacts().Capabilities['CanInsert']
 
     def getCapabilities(self):
-        my_dict = {'CanUpdate': False,
-                   'CanInsert': False,
-                   'CanDelete': False}
-
-        my_parents = self.getTypeTree()
-        for my_type in reversed(my_parents):
-            if not isinstance(my_type, RedfishType): continue
-            try:
-                element = my_type.type_soup.find("Annotation", attrs={"Term": "Capabilities.InsertRestrictions"})
-                if element:
-                    my_dict['CanInsert'] = element.find("PropertyValue").get('Bool', 'False').lower() == 'true'
-                element = my_type.type_soup.find("Annotation", attrs={"Term": "Capabilities.UpdateRestrictions"})
-                if element:
-                    my_dict['CanUpdate'] = element.find("PropertyValue").get('Bool', 'False').lower() == 'true'
-                element = my_type.type_soup.find("Annotation", attrs={"Term": "Capabilities.DeleteRestrictions"})
-                if element:
-                    my_dict['CanDelete'] = element.find("PropertyValue").get('Bool', 'False').lower() == 'true'
-            except Exception as e:
-                my_logger.debug('Exception caught while checking Uri', exc_info=1)
-                my_logger.warning('Could not gather info from Capabilities annotation')
-                return {'CanUpdate': False, 'CanInsert': False, 'CanDelete': False}
-
-        return my_dict
+        return dict(self.getFacts().Capabilities)
 
     @property
     def DynamicProperties(self):
-        my_parents = self.getTypeTree()
-        for my_type in reversed(my_parents):
-            if not isinstance(my_type, RedfishType): continue
-            try:
-                dynamic = my_type.type_soup.find("Annotation", attrs={"Term": "Redfish.DynamicPropertyPatterns"})
-                if dynamic: 
-                    # create PropertyPattern dict containing pattern and type for DynamicPropertyPatterns validation
-                    pattern_elem = dynamic.find("PropertyValue", Property="Pattern")
-                    type_elem = dynamic.find("PropertyValue", Property="Type")
-                    if pattern_elem and type_elem:
-                        return {
-                            "Pattern": pattern_elem.get("String"),
-                            "Type": type_elem.get("String"),
-                        }
-                    if pattern_elem and not type_elem or type_elem and not pattern_elem:
-                        raise ValueError('Cannot have pattern with Type in DynamicProperty annotation')
-
-            except Exception as e:
-                my_logger.debug('Exception caught while checking Dynamic', exc_info=1)
-                my_logger.warning('Could not gather info from DynamicProperties annotation')
-                return None 
-        
-        return None
-
+        dynamic = self.getFacts().DynamicProperties
+        return dict(dynamic) if dynamic is not None else None
 
     def getUris(self):
         """
@@ -489,21 +997,112 @@ class RedfishType:
         :return: Array of Uris
         :rtype: list
         """
-        my_parents = self.getTypeTree()
-        expectedUris = []
-        for my_type in my_parents:
-            if not isinstance(my_type, RedfishType): continue
-            uriElement = my_type.type_soup.find("Annotation", attrs={"Term": "Redfish.Uris"})
-            if uriElement is not None:
+        return list(self.getFacts().Uris)
+
+    def getUriMatcher(self):
+        """
+        Returns the matcher of Redfish.Uris values, compiled once per type
+
+        :return: Matcher of our Uris
+        :rtype: UriMatcher
+        """
+        if self._isStale() or self._uri_matcher is None:
+            self._uri_matcher = UriMatcher(self.getFacts().Uris)
+        return self._uri_matcher
+
+    def getFacts(self):
+        """
+        Returns the annotation-derived facts of this type, combined over its type tree
+
+        Resolved once per type, so validating a resource does not read any annotation elements
+
+        :return: HasAdditional, Capabilities, DynamicProperties and Uris of this type
+        :rtype: TypeFacts
+        """
+        if self._isStale() or self._facts is None:
+            my_facts = [x._getLocalFacts() for x in self.getTypeTree() if isinstance(x, RedfishType)]
+
+            capabilities = {'CanUpdate': False, 'CanInsert': False, 'CanDelete': False}
+            for local in reversed(my_facts):
+                if local.Capabilities is False:
+                    capabilities = {'CanUpdate': False, 'CanInsert': False, 'CanDelete': False}
+                    break
+                capabilities.update(local.Capabilities)
+
+            dynamic = None
+            for local in reversed(my_facts):
+                if local.DynamicProperties is not None:
+                    dynamic = MappingProxyType(local.DynamicProperties) if local.DynamicProperties else None
+                    break
+
+            expectedUris = []
+            for local in my_facts:
+                if local.Uris is False:
+                    expectedUris = []
+                elif local.Uris is not None:
+                    expectedUris += local.Uris
+
+            self._facts = TypeFacts(any(local.HasAdditional for local in my_facts), MappingProxyType(capabilities), dynamic, tuple(expectedUris))
+        return self._facts
+
+    def _getLocalFacts(self):
+        """
+        Returns the annotation-derived facts of this type alone, read once from its element
+
+        Capabilities only hold the restrictions annotated on this type, DynamicProperties and Uris are None if not annotated,
+        and any of them is False if its annotation could not be read
+        """
+        if self._local_facts is None:
+            annotations = {}
+            for element in self.type_element.find_all("Annotation"):
+                term = element.get("Term")
+                if term in fact_terms and term not in annotations:
+                    annotations[term] = element
+
+            additionalElement = annotations.get("OData.AdditionalProperties")
+            HasAdditional = ('Bios' in self.fulltype and 'Attributes' in self.fulltype) or self.fulltype == 'MessageRegistry.v1_0_0.MessageProperty' or \
+                (additionalElement is not None and additionalElement.get("Bool", False) in ["True", "true", True])
+
+            capabilities = {}
+            try:
+                for key, term in [('CanInsert', 'Capabilities.InsertRestrictions'), ('CanUpdate', 'Capabilities.UpdateRestrictions'), ('CanDelete', 'Capabilities.DeleteRestrictions')]:
+                    element = annotations.get(term)
+                    if element:
+                        capabilities[key] = element.find("PropertyValue").get('Bool', 'False').lower() == 'true'
+            except Exception as e:
+                my_logger.debug('Exception caught while checking Capabilities', exc_info=1)
+                my_logger.warning('Could not gather info from Capabilities annotation')
+                capabilities = False
+
+            dynamic = None
+            element = annotations.get("Redfish.DynamicPropertyPatterns")
+            if element:
+                # create PropertyPattern dict containing pattern and type for DynamicPropertyPatterns validation
+                pattern_elem = element.find("PropertyValue", Property="Pattern")
+                type_elem = element.find("PropertyValue", Property="Type")
+                if pattern_elem and type_elem:
+                    dynamic = {
+                        "Pattern": pattern_elem.get("String"),
+                        "Type": type_elem.get("String"),
+                    }
+                elif pattern_elem or type_elem:
+                    my_logger.debug('Cannot have pattern with Type in DynamicProperty annotation of {}'.format(self.fulltype))
+                    my_logger.warning('Could not gather info from DynamicProperties annotation')
+                    dynamic = False
+
+            expectedUris = None
+            element = annotations.get("Redfish.Uris")
+            if element is not None:
                 try:
-                    all_strings = uriElement.find("Collection").find_all("String")
-                    expectedUris += [e.contents[0] for e in all_strings]
+                    expectedUris = tuple(e.contents[0] for e in element.find("Collection").find_all("String"))
                 except Exception as e:
                     my_logger.debug('Exception caught while checking Uri', exc_info=1)
                     my_logger.warning('Could not gather info from Redfish.Uris annotation')
-                    expectedUris = []
-        return expectedUris
-     
+                    expectedUris = False
+
+            self._local_facts = TypeFacts(HasAdditional, capabilities, dynamic, expectedUris)
+        return self._local_facts
+
     @property 
     def parent_type(self):
         """
@@ -513,10 +1112,10 @@ class RedfishType:
             string, boolean
             None, False
         """
-        soup = self.type_soup
+        element = self.type_element
         parent_type = (
-            soup["UnderlyingType"] if self.tag_type == "TypeDefinition"
-            else soup.get("BaseType", soup.get("Type", None))
+            element["UnderlyingType"] if self.tag_type == "TypeDefinition"
+            else element.get("BaseType", element.get("Type", None))
         )
         if parent_type is not None:
             IsCollection = re.match('Collection\(.*\)', parent_type) is not None
@@ -524,20 +1123,37 @@ class RedfishType:
         else:
             return None, False
         
+    def _isStale(self):
+        """
+        Returns True if the catalog changed since this type resolved its parents, clearing what was resolved
+        """
+        generation = self.catalog.generation if self.catalog is not None else 0
+        if self._generation != generation:
+            self._parent_types, self._all_properties, self._facts, self._uri_matcher = None, None, None, None
+            self._skeleton = None
+            self._generation = generation
+            return True
+        return False
+
     def getTypeTree(self, tree=None):
         """
         Returns tree of RedfishType/string of parent types
+
+        The parents are resolved once, and again only if the catalog changes
         """
         if not tree: tree = [self]
-        my_type, collection = self.parent_type
-        if my_type:
-            if 'Edm.' not in my_type:
-                my_real_type = my_type
-                type_obj = self.owner.parent_doc.catalog.getSchemaDocByClass(my_real_type).getTypeInSchemaDoc(my_real_type)
-                return type_obj.getTypeTree(tree + [type_obj])
+        if self._isStale() or self._parent_types is None:
+            my_type, collection = self.parent_type
+            if my_type:
+                if 'Edm.' not in my_type:
+                    my_real_type = my_type
+                    type_obj = self.owner.parent_doc.catalog.getSchemaDocByClass(my_real_type).getTypeInSchemaDoc(my_real_type)
+                    self._parent_types = tuple(type_obj.getTypeTree())
+                else:
+                    self._parent_types = (my_type,)
             else:
-                return tree + [my_type]
-        return tree
+                self._parent_types = ()
+        return tree + list(self._parent_types)
 
     def getBaseType(self, is_collection=False):
         """
@@ -568,11 +1184,34 @@ class RedfishType:
     def getProperties(self):
         """
         Returns all our properties from our current type and its parents
+
+        The merged properties are built once, and again only if the catalog changes
         """
-        all_properties = {}
-        for type_obj in self.getTypeTree():
-            all_properties.update(type_obj.unique_properties)
-        return all_properties
+        if self._isStale() or self._all_properties is None:
+            all_properties = {}
+            for type_obj in self.getTypeTree():
+                all_properties.update(type_obj.unique_properties)
+            self._all_properties = MappingProxyType(all_properties)
+        return self._all_properties
+
+    def getPropertySkeleton(self):
+        """
+        Returns the base type of each of our properties, which decides how a RedfishObject represents it
+
+        The skeleton is built once, and again only if the catalog changes
+
+        :return: property name to its type and base type, or None as base type if its schema is missing
+        :rtype: MappingProxyType
+        """
+        if self._isStale() or self._skeleton is None:
+            skeleton = {}
+            for prop, typ in self.getProperties().items():
+                try:
+                    skeleton[prop] = (typ, typ.getBaseType()[0])
+                except MissingSchemaError:
+                    skeleton[prop] = (typ, None)
+            self._skeleton = MappingProxyType(skeleton)
+        return self._skeleton
 
     def validate(self, val, added_pattern=None):
         """
@@ -580,20 +1219,23 @@ class RedfishType:
         """
         my_logger.debug((self, val, self.fulltype, self.tag_type, self.parent_type))
         if val == REDFISH_ABSENT:
-            if self.type_soup.find("Annotation", attrs={"Term": "Redfish.Required"}):
+            if self._required is None:
+                self._required = self.type_element.find("Annotation", attrs={"Term": "Redfish.Required"}) is not None
+            if self._required:
                 raise ValueError("Should not be absent")
             else:
                 return True
         if val is None: 
-            if self.type_soup.get("Nullable") in ["false", "False", False]:
+            if self.type_element.get("Nullable") in ["false", "False", False]:
                 raise ValueError("Should not be null")
             else:
                 return True
         # recurse parent_types until we get a basic type...
         if self.tag_type == "EnumType":
-            my_enums = [x["Name"] for x in self.type_soup.find_all("Member")]
-            if val not in my_enums:
-                raise ValueError("Value {} Enum not found in {}".format(val, my_enums))
+            if self._members is None:
+                self._members = dict.fromkeys(x["Name"] for x in self.type_element.find_all("Member")).keys()
+            if not isinstance(val, str) or val not in self._members:
+                raise ValueError("Value {} Enum not found in {}".format(val, list(self._members)))
         if self.tag_type == "ComplexType":
             if not isinstance(val, dict):
                 raise ValueError("Complex value is not Dict")
@@ -606,22 +1248,47 @@ class RedfishType:
                 type_obj = self.owner.parent_doc.catalog.getSchemaDocByClass(my_type).getTypeInSchemaDoc(my_type)
                 return type_obj.validate(val)
             else:
-                enum_annotation = self.type_soup.find('Annotation', attrs={'Term': 'Redfish.Enumeration'}, recursive=False)
-                validPatternAttr = self.type_soup.find('Annotation', attrs={'Term': 'Validation.Pattern'})
-                validMinAttr = self.type_soup.find('Annotation', attrs={'Term': 'Validation.Minimum'})
-                validMaxAttr = self.type_soup.find('Annotation', attrs={'Term': 'Validation.Maximum'})
-                validMin, validMax = int(validMinAttr['Int']) if validMinAttr is not None else None, \
-                    int(validMaxAttr['Int']) if validMaxAttr is not None else None
-                validPattern = validPatternAttr.get('String', '') if validPatternAttr is not None else None
-                if added_pattern is not None:
+                my_validator = self.getValidator()
+                if my_validator.Enumeration is not None:
+                    if isinstance(val, str) and val in my_validator.Enumeration:
+                        return True
+                    # give the same error as a pattern of the enumeration would
+                    validPattern = '|'.join([re.escape(x) for x in my_validator.Enumeration])
+                elif added_pattern is not None:
                     validPattern = added_pattern
+                else:
+                    validPattern = my_validator.Pattern
 
-                if my_type == 'Edm.String' and enum_annotation is not None:
-                    memberList = enum_annotation.find('Collection').find_all('PropertyValue', attrs={'Property': 'Member'})
-                    validPattern = '|'.join([re.escape(x.get('String')) for x in memberList if x.get('String')])
-
-                return RedfishProperty.validate_basic(val, my_type, validPattern, validMin, validMax)
+                return RedfishProperty.validate_basic(val, my_type, validPattern, my_validator.Minimum, my_validator.Maximum)
         return True
+
+    def getValidator(self):
+        """
+        Returns the checks of an Edm-backed type, read and compiled once from its annotations
+
+        Pattern is the compiled Validation.Pattern, and Enumeration the ordered set of Redfish.Enumeration members of an Edm.String
+
+        :return: Pattern, Minimum, Maximum and Enumeration of this type
+        :rtype: TypeValidator
+        """
+        if self._validator is None:
+            my_type, collection = self.parent_type
+            enum_annotation = self.type_element.find('Annotation', attrs={'Term': 'Redfish.Enumeration'}, recursive=False)
+            validPatternAttr = self.type_element.find('Annotation', attrs={'Term': 'Validation.Pattern'})
+            validMinAttr = self.type_element.find('Annotation', attrs={'Term': 'Validation.Minimum'})
+            validMaxAttr = self.type_element.find('Annotation', attrs={'Term': 'Validation.Maximum'})
+            validMin, validMax = int(validMinAttr['Int']) if validMinAttr is not None else None, \
+                int(validMaxAttr['Int']) if validMaxAttr is not None else None
+            validPattern = re.compile(validPatternAttr.get('String', '')) if validPatternAttr is not None else None
+
+            validEnumeration = None
+            if my_type == 'Edm.String' and enum_annotation is not None:
+                memberList = enum_annotation.find('Collection').find_all('PropertyValue', attrs={'Property': 'Member'})
+                # an enumeration without members only allows an empty string, as its empty pattern did
+                validEnumeration = dict.fromkeys([x.get('String') for x in memberList if x.get('String')] or ['']).keys()
+
+            self._validator = TypeValidator(validPattern, validMin, validMax, validEnumeration)
+        return self._validator
     
     def as_json(self):
         return self.createObj().as_json()
@@ -654,7 +1321,7 @@ class RedfishProperty(object):
         self.added_pattern = None
 
     def populate(self, val, check=False):
-        eval_prop = copy.copy(self)
+        eval_prop = self.copy()
         eval_prop.Populated = True
         eval_prop.Value = val
         eval_prop.IsValid = True # Needs consistency, should be @property 
@@ -677,6 +1344,16 @@ class RedfishProperty(object):
                 eval_prop.IsValid = False
         return eval_prop
 
+    def copy(self):
+        """
+        Returns a shallow copy of this property, to be populated
+
+        Properties only hold plain attributes, so this skips the generic protocol of copy.copy
+        """
+        eval_prop = object.__new__(self.__class__)
+        eval_prop.__dict__.update(self.__dict__)
+        return eval_prop
+
     def as_json(self):
         my_dict = {x: y for x, y in vars(self).items() if x in ['Name', 'Type', 'Value', 'IsValid', 'Exists', 'SchemaExists']}
         if isinstance(self.Type, RedfishType):
@@ -700,11 +1377,11 @@ class RedfishProperty(object):
                 "Expected string value, got type {}".format(str(type(val)).strip("<>"))
             )
         if pattern is not None:
-            match = re.fullmatch(pattern, val)
+            match = pattern.fullmatch(val) if isinstance(pattern, re.Pattern) else re.fullmatch(pattern, val)
             if match is None:
                 raise ValueError(
                     "String '{}' does not match pattern '{}'".format(
-                        str(val), repr(pattern)
+                        str(val), repr(getattr(pattern, 'pattern', pattern))
                     )
                 )
         return True
@@ -755,15 +1432,15 @@ class RedfishProperty(object):
 
         elif my_type == "Edm.DateTimeOffset":
             return RedfishProperty.validate_string(
-                val, r".*(Z|(\+|-)[0-9][0-9]:[0-9][0-9])")
+                val, DATETIME_REGEX)
 
         elif my_type == "Edm.Duration":
             return RedfishProperty.validate_string(
-                val, r"P([0-9]+D)?(T([0-9]+H)?([0-9]+M)?([0-9]+(\.[0-9]+)?S)?)?")
+                val, DURATION_REGEX)
 
         elif my_type == "Edm.Guid":
             return RedfishProperty.validate_string(
-                val, r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
+                val, GUID_REGEX)
 
         elif my_type == "Edm.String":
             return RedfishProperty.validate_string(val, validPattern)
@@ -785,6 +1462,69 @@ class RedfishProperty(object):
             return False
 
 
+class PropertyMap(MutableMapping):
+    """Properties of a RedfishObject
+
+    Iterates over the names given first, then over properties added later
+    Properties of the given names are only created by the factory when first accessed
+
+    Populated properties are a view over the properties of their unpopulated object, the template,
+    where only the values given are stored, and the others are populated as absent when first accessed
+    """
+    def __init__(self, names, factory, template=None):
+        self.names = names
+        self.factory = factory
+        self.template = template
+        self.values = {}
+        self.added = []
+
+    def populateAbsent(self, exclude=None):
+        """
+        Returns a view of these properties populated as absent, until given their values
+
+        :param exclude: name of a property left out of the view
+        :type exclude: str
+        :rtype: PropertyMap
+        """
+        my_names = self.names if not self.added and exclude not in self.names else dict.fromkeys(x for x in self if x != exclude)
+        return PropertyMap(my_names, self._populateAbsent, self)
+
+    def _populateAbsent(self, key):
+        return self[key].populate(REDFISH_ABSENT)
+
+    def __getitem__(self, key):
+        if key in self.values:
+            return self.values[key]
+        if key in self.names:
+            value = self.values[key] = self.factory(key)
+            return value
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in self.values and key not in self.names:
+            self.added.append(key)
+        self.values[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self.values.pop(key, None)
+        if key in self.names:
+            self.names = dict.fromkeys(x for x in self.names if x != key)
+        else:
+            self.added.remove(key)
+
+    def __contains__(self, key):
+        return key in self.names or key in self.values
+
+    def __iter__(self):
+        yield from self.names
+        yield from self.added
+
+    def __len__(self):
+        return len(self.names) + len(self.added)
+
+
 class RedfishObject(RedfishProperty):
     """Represents Redfish as they are represented as Resource/ComplexTypes
 
@@ -809,17 +1549,19 @@ class RedfishObject(RedfishProperty):
         self.IsValid = False
         self.HasValidUri = False
         self.HasValidUriStrict = False
-        self.properties = {}
-        for prop, typ in redfish_type.getProperties().items():
-            try:
-                base, collection = typ.getBaseType()
-                if base == 'complex':
-                    self.properties[prop] = RedfishObject(typ, prop, self)
-                else:
-                    self.properties[prop] = RedfishProperty(typ, prop, self)
-            except MissingSchemaError:
-                self.properties[prop] = RedfishProperty(REDFISH_ABSENT, prop, self)
-                my_logger.warning('Schema not found for {}'.format(typ))
+        self.properties = PropertyMap(redfish_type.getPropertySkeleton(), self._createProperty)
+
+    def _createProperty(self, prop):
+        """
+        Creates one of our properties from the skeleton of our type
+        """
+        typ, base = self.Type.getPropertySkeleton()[prop]
+        if base is None:
+            my_logger.warning('Schema not found for {}'.format(typ))
+            return RedfishProperty(REDFISH_ABSENT, prop, self)
+        if base == 'complex':
+            return RedfishObject(typ, prop, self)
+        return RedfishProperty(typ, prop, self)
 
     def populate(self, payload, check=False, casted=False):
         eval_obj = super().populate(payload)
@@ -832,12 +1574,12 @@ class RedfishObject(RedfishProperty):
         if payload == REDFISH_ABSENT or payload is None:
             eval_obj.Collection = []
             if payload is None:
-                sub_obj = copy.copy(eval_obj)
+                sub_obj = eval_obj.copy()
                 eval_obj.Collection = [sub_obj]
             eval_obj.IsValid = eval_obj.Type.IsNullable
             eval_obj.HasValidUri = True
             eval_obj.HasValidUriStrict = False
-            eval_obj.properties = {x:y.populate(REDFISH_ABSENT) for x, y in eval_obj.properties.items()}
+            eval_obj.properties = eval_obj.properties.populateAbsent()
             return eval_obj
 
         # Representation for Complexes as Collection, unless it is not a list
@@ -850,7 +1592,7 @@ class RedfishObject(RedfishProperty):
             if sub_payload is None:
                 # If the object is null, treat it as an empty object for the cataloging
                 sub_payload = {}
-            sub_obj = copy.copy(eval_obj)
+            sub_obj = eval_obj.copy()
 
             # Only valid if we are a dictionary...
             # todo: see above None/REDFISH_ABSENT block
@@ -860,7 +1602,7 @@ class RedfishObject(RedfishProperty):
                 sub_obj.Collection = []
                 sub_obj.HasValidUri = True
                 sub_obj.HasValidUriStrict = False
-                sub_obj.properties = {x:y.populate(REDFISH_ABSENT) for x, y in sub_obj.properties.items()}
+                sub_obj.properties = sub_obj.properties.populateAbsent()
                 evals.append(sub_obj)
                 continue
 
@@ -904,17 +1646,13 @@ class RedfishObject(RedfishProperty):
                         parent = parent.parent
                         my_limit = parent.Type.Namespace
                 my_type = sub_obj.Type.Type
-                top_ns = my_ns
-                # get type order from bottom up of SchemaDoc
-                for top_ns, schema in reversed(list(sub_obj.Type.catalog.getSchemaDocByClass(my_ns).classes.items())):
-                    # if our object type is in schema... check for limit
-                    if my_type in schema.my_types:
-                        if splitVersionString(top_ns) <= splitVersionString(my_limit):
-                            my_ns = top_ns
-                            break
-                # ISSUE: We can't cast under v1_0_0, get the next best Type
-                if my_ns == my_ns_unversioned:
+                # get the highest version of our type within the limit from its SchemaDoc
+                top_ns = sub_obj.Type.catalog.getHighestTypeVersion(my_ns, my_type, my_limit)
+                if top_ns is not None:
                     my_ns = top_ns
+                # ISSUE: We can't cast under v1_0_0, get the next best Type
+                elif my_ns == my_ns_unversioned:
+                    my_ns = next(iter(sub_obj.Type.catalog.getSchemaDocByClass(my_ns).classes), my_ns)
                 if my_ns not in sub_obj.Type.Namespace:
                     my_logger.verbose1(('Morphing Complex', my_ns, my_type, my_limit))
                     new_type_obj = sub_obj.Type.catalog.getSchemaDocByClass(my_ns).getTypeInSchemaDoc('.'.join([my_ns, my_type]))
@@ -925,21 +1663,18 @@ class RedfishObject(RedfishProperty):
             # Validate our Uri
             sub_obj.HasValidUri = True
             sub_obj.HasValidUriStrict = True
-            allowable_uris = sub_obj.Type.getUris()
             # If we have expected URIs and @odata.id
             # And we AREN'T a navigation property
-            if not sub_obj.Type.catalog.flags['ignore_uri_checks'] and len(allowable_uris) and '@odata.id' in sub_payload:
+            if not sub_obj.Type.catalog.flags['ignore_uri_checks'] and len(sub_obj.Type.getFacts().Uris) and '@odata.id' in sub_payload:
                 # Strip our URI and warn if that's the case
                 my_odata_id = sub_payload['@odata.id']
                 if my_odata_id != '/redfish/v1/' and my_odata_id.endswith('/'):
                     if check: my_logger.warning('Stripping end of URI... {}'.format(my_odata_id))
                     my_odata_id = my_odata_id.rstrip('/')
 
-                # Initial check if our URI matches our format at all
-                # Setup REGEX...
-                my_uri_regex = "^{}$".format("|".join(allowable_uris))
-                my_uri_regex = re.sub(URI_ID_REGEX, VALID_ID_REGEX, my_uri_regex)
-                sub_obj.HasValidUri = re.fullmatch(my_uri_regex, my_odata_id) is not None
+                # Initial check if our URI matches our format at all, and which URI it matches
+                my_uri_match = sub_obj.Type.getUriMatcher().match(my_odata_id)
+                sub_obj.HasValidUri = my_uri_match is not None
                 sub_obj.HasValidUriStrict = sub_obj.HasValidUri
 
                 if 'Resource.Resource' in sub_obj.Type.getTypeTree():
@@ -952,21 +1687,11 @@ class RedfishObject(RedfishProperty):
                 # check that our ID is matching
                 # this won't check NavigationProperties but the Resources will
                 if sub_obj.HasValidUri and not sub_obj.Type.IsNav:
-                    # pair our type, Id value, and odata.id value
-                    my_odata_split = my_odata_id.split('/')
-                    my_type, my_id, my_uri_id = sub_obj.Type.Type, sub_payload.get('Id'), my_odata_split[-1]
-
-                    for schema_uri in allowable_uris:
-                        # regex URI check to confirm which URI 
-                        my_uri_regex = re.sub(URI_ID_REGEX, VALID_ID_REGEX, "^{}$".format(schema_uri))
-                        if re.fullmatch(my_uri_regex, my_odata_id):
-                            # pair our uri with the current resource
-                            schema_uri_end = schema_uri.rsplit('/')[-1]
-                            # if our Uri is expecting an Id, then check if they match, otherwise we are already passing
-                            if re.match(URI_ID_REGEX, schema_uri_end):
-                                if my_id is not None:
-                                    sub_obj.HasValidUriStrict = my_id == my_uri_id
-                            break
+                    # pair our Id value with the Id segment of our uri
+                    # if our Uri is expecting an Id, then check if they match, otherwise we are already passing
+                    my_id = sub_payload.get('Id')
+                    if my_uri_match.Id is not None and my_id is not None:
+                        sub_obj.HasValidUriStrict = my_id == my_uri_match.Id
 
             # TODO: Oem support is able, but it is tempermental for Actions and Additional properties
             #if 'Resource.OemObject' in sub_obj.Type.getTypeTree():
@@ -975,9 +1700,12 @@ class RedfishObject(RedfishProperty):
 
             # populate properties
             if sub_obj.Name == 'Actions':
-                sub_obj.properties = {x:y.populate(sub_payload.get(x, REDFISH_ABSENT)) for x, y in sub_obj.properties.items() if x != 'Oem'}
+                sub_obj.properties = sub_obj.properties.populateAbsent(exclude='Oem')
             else:
-                sub_obj.properties = {x:y.populate(sub_payload.get(x, REDFISH_ABSENT)) for x, y in sub_obj.properties.items()}
+                sub_obj.properties = sub_obj.properties.populateAbsent()
+            for x in sub_obj.properties.names:
+                if x in sub_payload:
+                    sub_obj.properties[x] = sub_obj.properties.template[x].populate(sub_payload[x])
 
             # additional_props
             if sub_obj.Type.DynamicProperties:
@@ -994,16 +1722,15 @@ class RedfishObject(RedfishProperty):
                 my_property_names = [x for x in sub_payload if x not in sub_obj.properties if re.match(prop_pattern, x) and '@' not in x]
                 for add_name in my_property_names:
                     if 'Edm.' in my_odata_type:
-                        my_new_term = '<Term Name="{}" Type="{}"> </Term>'.format(add_name, my_odata_type) # Make a pseudo tag because RedfishType requires it...
-                        new_soup = BeautifulSoup(my_new_term, "xml").find('Term')
-                        type_obj = RedfishType(new_soup, sub_obj.Type.owner)
+                        type_obj = sub_obj.Type.owner.getAdditionalTerm(my_odata_type)
                     else:
                         type_obj = sub_obj.Type.catalog.getSchemaDocByClass(my_odata_type).getTypeInSchemaDoc(my_odata_type)
                     if type_obj.getBaseType()[0] == 'complex':
                         object = RedfishObject(type_obj, name=add_name, parent=self)
                     else:
                         object = RedfishProperty(type_obj, name=add_name, parent=self)
-                    my_logger.debug('Populated {} with {}'.format(my_property_names, object.as_json()))
+                    if my_logger.isEnabledFor(logging.DEBUG):
+                        my_logger.debug('Populated {} with {}'.format(my_property_names, object.as_json()))
                     my_logger.verbose1(('Adding Additional', add_name, my_odata_type, sub_obj.Type))
                     sub_obj.properties[add_name] = object.populate(sub_payload.get(add_name, REDFISH_ABSENT))
 
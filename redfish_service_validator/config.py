@@ -12,7 +12,7 @@ my_logger.setLevel(logging.DEBUG)
 config_struct = {
     'Tool': ['verbose'],
     'Host': ['ip', 'username', 'password', 'description', 'forceauth', 'authtype', 'token', 'ext_http_proxy', 'ext_https_proxy', 'serv_http_proxy', 'serv_https_proxy'],
-    'Validator': ['payload', 'logdir', 'oemcheck', 'debugging', 'schema_directory', 'uricheck', 'mockup']
+    'Validator': ['payload', 'logdir', 'oemcheck', 'debugging', 'schema_directory', 'uricheck', 'mockup', 'schema_cache', 'lazy_catalog', 'catalog_jobs', 'response_cache_size', 'jobs', 'expand', 'paged_member_limit', 'sampling', 'sampling_seed', 'record', 'offline', 'etag_store', 'result_store']
 }
 
 config_options = [x for name in config_struct for x in config_struct[name]]
@@ -53,6 +53,10 @@ def convert_config_to_args(args, config):
                 elif my_config[section][option] not in ['', None]:
                     if option.lower() == 'payload':
                         setattr(args, option, my_config[section][option].split(' '))
+                    elif isinstance(getattr(args, option, None), bool):
+                        setattr(args, option, my_config[section][option].lower() in ['true', 'yes', 'on', '1'])
+                    elif isinstance(getattr(args, option, None), int):
+                        setattr(args, option, int(my_config[section][option]))
                     else:
                         setattr(args, option, my_config[section][option])
     my_config_dict = config_parse_to_dict(my_config)
@@ -0,0 +1,307 @@
+# Copyright Notice:
+# Copyright 2016-2020 DMTF. All rights reserved.
+# License: BSD 3-Clause License. For full text see link: https://github.com/DMTF/Redfish-Service-Validator/blob/master/LICENSE.md
+
+import json
+import os
+import zipfile
+from urllib.parse import urlparse
+
+import redfish as rf
+
+import logging
+my_logger = logging.getLogger(__name__)
+
+# headers of responses worth replaying
+recorded_headers = ['Allow', 'Content-Type', 'ETag', 'Link', 'Location', 'OData-Version']
+
+
+def checkMockupKey(key):
+    """
+    Check that a key, a folder with forward slashes, stays inside the mockup it is joined to
+
+    :param key: folder relative to the mockup, without leading or trailing slashes
+    :return: the key, or None if it has empty, relative or absolute segments
+    """
+    if key == '':
+        return key
+    for segment in key.split('/'):
+        if segment in ['', '.', '..'] or os.sep in segment or (os.altsep and os.altsep in segment) \
+                or os.path.isabs(segment) or os.path.splitdrive(segment)[0]:
+            return None
+    return key
+
+
+def getMockupKey(URLDest):
+    """
+    Get the key of a URI in a mockup index, its folder relative to /redfish/v1 with forward slashes
+
+    :param URLDest: path to URI, without query or fragment
+    :return: key, or None if the URI would lead out of the mockup
+    """
+    return checkMockupKey(URLDest.replace('/redfish/v1/', '', 1).strip('/'))
+
+
+def isInsideFolder(folder, filepath):
+    """
+    Check that a path stays under a folder once symbolic links are resolved
+    """
+    root = os.path.realpath(folder)
+    return os.path.commonpath([root, os.path.realpath(filepath)]) == root
+
+
+def getMockupDir(mockup, URLDest):
+    """
+    Get the folder of a URI in a mockup, relative to /redfish/v1
+
+    :param mockup: folder of the mockup
+    :param URLDest: path to URI, without query or fragment
+    :return: path of the folder, or None if the URI would lead out of the mockup
+    """
+    key = getMockupKey(URLDest)
+    if key is None:
+        return None
+    mockup_dir = os.path.join(mockup, key)
+    return mockup_dir if isInsideFolder(mockup, mockup_dir) else None
+
+
+class MockupIndex:
+    """
+    Index of the resources of a mockup, from a folder, a zip archive of the folder, or a JSONL file
+
+    The source is scanned once for its files, so finding the file of a URI needs no filesystem access;
+    each resource is read when it is requested, and kept in memory only by the ResponseCache of the service,
+    within its size
+
+    Each line of a JSONL file is a resource, either as its payload with its @odata.id, or as an object
+    with its "uri", "body", and optionally its "status" and "headers"
+    """
+
+    files = ['index.json', 'index.xml', 'headers.json', 'status.json']
+
+    def __init__(self, source):
+        self.source = source
+        self.archive = None
+        self.entries = {}
+        self.read = 0
+        if os.path.isdir(source):
+            self.scanFolder()
+        elif zipfile.is_zipfile(source):
+            self.archive = zipfile.ZipFile(source)
+            self.scanArchive()
+        elif os.path.isfile(source):
+            self.scanLines()
+        else:
+            my_logger.warning('Mockup {} not found, no resources are read from it'.format(source))
+        my_logger.debug('Indexed {} resources of mockup {}'.format(len(self.entries), source))
+
+    def add(self, folder, name, locator):
+        folder = folder.replace(os.sep, '/').strip('/')
+        self.entries.setdefault(folder, {})[name] = locator
+
+    def scanFolder(self):
+        for folder, _, names in os.walk(self.source):
+            for name in names:
+                # links inside the mockup may point anywhere
+                if name in self.files and isInsideFolder(self.source, os.path.join(folder, name)):
+                    self.add(os.path.relpath(folder, self.source) if folder != self.source else '', name, os.path.join(folder, name))
+
+    def scanArchive(self):
+        names = [x for x in self.archive.namelist() if not x.endswith('/')]
+        # an archive of the mockup folder itself has every file under the name of the folder
+        top = {x.split('/', 1)[0] for x in names}
+        prefix = top.pop() + '/' if len(top) == 1 and all('/' in x for x in names) else ''
+        for name in names:
+            folder, _, base = name[len(prefix):].rpartition('/')
+            if base in self.files and checkMockupKey(folder) is not None:
+                self.add(folder, base, name)
+
+    def scanLines(self):
+        with open(self.source, 'rb') as lines:
+            num = 0
+            while True:
+                # only where each line starts is kept, the line is read again when its resource is requested
+                offset, line = lines.tell(), lines.readline()
+                num += 1
+                if line == b'':
+                    break
+                if line.strip() == b'':
+                    continue
+                record = self.parseLine(line, num)
+                uri = record['uri']
+                if not isinstance(uri, str):
+                    raise ValueError('Line {} of mockup {} has no uri or @odata.id'.format(num, self.source))
+                key = getMockupKey(urlparse(uri).path)
+                if key is None:
+                    my_logger.warning('Line {} of mockup {} has a URI out of the mockup, ignoring it: {}'.format(num, self.source, uri))
+                    continue
+                self.entries[key] = {'line': (offset, num)}
+
+    def parseLine(self, line, num):
+        """
+        Parse a line of a JSONL mockup into a record with the "uri" and "body" of its resource
+        """
+        record = json.loads(line)
+        if not isinstance(record, dict):
+            raise ValueError('Line {} of mockup {} is not a JSON object'.format(num, self.source))
+        if 'uri' not in record or 'body' not in record:
+            record = {'uri': record.get('@odata.id'), 'body': record}
+        return record
+
+    def getKey(self, URLDest, layouts=False):
+        """
+        Get the key of the resource of a URI, if the mockup has one
+
+        :param URLDest: path to URI, without query or fragment
+        :param layouts: Also look relative to the root of the service, as written by the DMTF Redfish Mockup Creator,
+            and for the ServiceRoot at the top of the mockup, as in the mockups published by DMTF
+        :return: key, or None
+        """
+        candidates = [getMockupKey(URLDest)]
+        if layouts:
+            path = URLDest.strip('/')
+            candidates.append(checkMockupKey(path))
+            if path == 'redfish/v1':
+                candidates.append('')
+        for key in candidates:
+            if key is None:
+                continue
+            entry = self.entries.get(key, {})
+            if 'index.json' in entry or 'index.xml' in entry or 'line' in entry:
+                return key
+        return None
+
+    def readFile(self, locator):
+        if self.archive is not None:
+            return self.archive.read(locator).decode('utf-8')
+        with open(locator, encoding='utf-8') as f:
+            return f.read()
+
+    def readResource(self, key):
+        """
+        Read the status, headers and body of a resource
+
+        Status and headers come from the status.json and headers.json next to the body if they were recorded,
+        otherwise the body is returned with status 200
+        """
+        entry = self.entries[key]
+        if 'line' in entry:
+            offset, num = entry['line']
+            with open(self.source, 'rb') as lines:
+                lines.seek(offset)
+                record = self.parseLine(lines.readline(), num)
+            body = record['body']
+            headers = record.get('headers', {'Content-Type': 'application/json' if not isinstance(body, str) else 'application/xml'})
+            return record.get('status', 200), dict(headers), body if isinstance(body, str) else json.dumps(body)
+        name = 'index.json' if 'index.json' in entry else 'index.xml'
+        body = self.readFile(entry[name])
+        if 'headers.json' in entry:
+            headers = json.loads(self.readFile(entry['headers.json'])).get('GET', {})
+        elif name == 'index.json':
+            # the body is handed to the response as is, so check it is JSON here
+            json.loads(body)
+            headers = {'Content-Type': 'application/json'}
+        else:
+            headers = {'Content-Type': 'application/xml'}
+        status = 200
+        if 'status.json' in entry:
+            status = json.loads(self.readFile(entry['status.json'])).get('GET', 200)
+        return status, headers, body
+
+    def getResponse(self, key, marked=True):
+        """
+        Get the response of a resource of the mockup
+
+        :param key: key of the resource, from getKey
+        :param marked: Add an X-Redfish-Mockup header, so the validation warns that the response is not from the service
+        :return: StaticRestResponse
+        """
+        status, headers, body = self.readResource(key)
+        self.read += 1
+        if marked:
+            headers['X-Redfish-Mockup'] = 'true'
+        return rf.rest.v1.StaticRestResponse(Status=status, Headers=headers, Content=body)
+
+    def close(self):
+        if self.archive is not None:
+            self.archive.close()
+            self.archive = None
+
+
+class MockupRecorder:
+    """
+    Writes the responses of a service into a mockup, in the layout read by the mockup option
+
+    Each resource gets its body as index.json, or index.xml for XML, along with headers.json and time.json
+    in the layout of the DMTF Redfish Mockup Creator, and a status.json when its status is not 200;
+    members of expanded collections only get their body, as the service sent no headers for them
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.recorded = 0
+
+    def record(self, URLDest, response, elapsed):
+        """
+        Write the response of a URI
+
+        :param URLDest: path to URI, without query or fragment
+        :param response: response of the service
+        :param elapsed: timedelta of the request
+        """
+        mockup_dir = getMockupDir(self.directory, URLDest)
+        if mockup_dir is None:
+            my_logger.error('Not recording the response of {}, as its URI leads out of {}'.format(URLDest, self.directory))
+            return
+        contenttype = response.getheader('content-type') or ''
+        name = 'index.xml' if 'xml' in contenttype else 'index.json'
+        headers = {x: response.getheader(x) for x in recorded_headers if response.getheader(x) is not None}
+        expanded = response.getheader('X-Redfish-Expanded') is not None
+        try:
+            os.makedirs(mockup_dir, exist_ok=True)
+            for other in ['index.json', 'index.xml', 'status.json'] + (['headers.json', 'time.json'] if expanded else []):
+                if other != name and os.path.isfile(os.path.join(mockup_dir, other)):
+                    os.remove(os.path.join(mockup_dir, other))
+            with open(os.path.join(mockup_dir, name), 'w', encoding='utf-8') as f:
+                f.write(response.text)
+            if not expanded:
+                with open(os.path.join(mockup_dir, 'headers.json'), 'w') as f:
+                    json.dump({'GET': headers}, f, indent=4)
+                with open(os.path.join(mockup_dir, 'time.json'), 'w') as f:
+                    json.dump({'GET_Time': '{:.3f}'.format(elapsed.total_seconds())}, f, indent=4)
+            if response.status != 200:
+                with open(os.path.join(mockup_dir, 'status.json'), 'w') as f:
+                    json.dump({'GET': response.status}, f, indent=4)
+        except OSError as e:
+            my_logger.error('Could not record the response of {} into {}: {}'.format(URLDest, mockup_dir, repr(e)))
+            return
+        self.recorded += 1
+
+
+class MockupClient:
+    """
+    Stands in for the redfish client of a service, with the responses of a complete mockup
+
+    Resources missing from the mockup are not found
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.requested = 0
+
+    def get_base_url(self):
+        return ''
+
+    def get(self, path, headers=None):
+        """
+        Get the response of a URI from the mockup
+
+        :param path: path to URI; a query is ignored
+        :param headers: ignored
+        :return: StaticRestResponse
+        """
+        self.requested += 1
+        key = self.index.getKey(path.split('?')[0], layouts=True)
+        if key is None:
+            return rf.rest.v1.StaticRestResponse(Status=404, Headers={'Content-Type': 'application/json'}, Content={})
+        return self.index.getResponse(key, marked=False)
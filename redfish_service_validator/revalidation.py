@@ -0,0 +1,234 @@
+# Copyright Notice:
+# Copyright 2016-2020 DMTF. All rights reserved.
+# License: BSD 3-Clause License. For full text see link: https://github.com/DMTF/Redfish-Service-Validator/blob/master/LICENSE.md
+
+import hashlib
+import json
+import os
+
+import redfish as rf
+
+from redfish_service_validator.helper import create_entry, LOG_ENTRY
+from redfish_service_validator.mockup import recorded_headers
+from redfish_service_validator.version import tool_version
+
+import logging
+my_logger = logging.getLogger(__name__)
+
+
+def getValidationFingerprint(service):
+    """
+    Get a digest of what the result of validating a payload depends on, besides the payload
+
+    :param service: rfService, with its catalog of schema files
+    :return: digest of the version of the tool, the schema files and the options of the validation
+    """
+    keys = [tool_version, service.catalog.getFingerprint(), service.config['uricheck'], service.catalog.flags['ignore_uri_checks'],
+            service.config.get('oemcheck', True)]
+    return hashlib.sha256(json.dumps(keys).encode()).hexdigest()
+
+
+def encodeResult(counts, messages, errors, warns):
+    return {'counts': dict(counts), 'errors': errors, 'warns': warns,
+            'messages': [[vars(m)[x] for x in LOG_ENTRY] for m in messages.values()]}
+
+
+def decodeResult(result):
+    result = dict(result)
+    result['messages'] = {x[0]: create_entry(*x) for x in result['messages']}
+    return result
+
+
+def readStore(filename, version, kind):
+    try:
+        with open(filename) as f:
+            store = json.load(f)
+        if store.get('version') == version:
+            return store
+        my_logger.debug('{} version differs, ignoring {}'.format(kind, filename))
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        my_logger.warning('Could not read {} {}: {}'.format(kind, filename, repr(e)))
+    return {}
+
+
+def writeStore(filename, store, kind):
+    try:
+        if os.path.dirname(filename):
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+        # written aside first, so an interrupted run leaves the last store whole
+        tmp_file = '{}.{}.tmp'.format(filename, os.getpid())
+        with open(tmp_file, 'w') as f:
+            json.dump(store, f, default=str)
+        os.replace(tmp_file, filename)
+        return True
+    except Exception as e:
+        my_logger.warning('Could not write {} {}: {}'.format(kind, filename, repr(e)))
+        return False
+
+
+class ETagStore:
+    """
+    ETags of the resources of a service, with their payloads and validation results, kept in between runs
+
+    Resources with a stored ETag are requested with If-None-Match; when the service answers 304 Not Modified,
+    the stored payload stands in for the response, and its stored result for its validation,
+    as long as the result comes from a validation with the same fingerprint
+    """
+
+    store_version = 1
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.resources = readStore(filename, ETagStore.store_version, 'ETag store').get('resources', {})
+        self.fingerprint = None
+        self.modified = False
+        self.conditional, self.not_modified, self.reused = 0, 0, 0
+
+    def getRequestHeaders(self, URLDest, headers):
+        """
+        Get the headers of a request, with If-None-Match when the ETag of the resource is stored
+
+        :param URLDest: path to URI, without query or fragment
+        :param headers: dict of request headers
+        :return: dict of request headers
+        """
+        entry = self.resources.get(URLDest)
+        if entry is None:
+            return headers
+        return dict(headers, **{'If-None-Match': entry['etag']})
+
+    def restore(self, URLDest, response):
+        """
+        Get the stored response of a resource that was not modified, or the response itself otherwise
+
+        :param URLDest: path to URI, without query or fragment
+        :param response: response of the service
+        :return: response
+        """
+        entry = self.resources.get(URLDest)
+        if entry is not None:
+            self.conditional += 1
+        if entry is None or response.status != 304:
+            return response
+        self.not_modified += 1
+        headers = dict(entry['headers'], **{'ETag': entry['etag'], 'X-Redfish-Not-Modified': entry['etag']})
+        return rf.rest.v1.StaticRestResponse(Status=200, Headers=headers, Content=entry['body'])
+
+    def update(self, URLDest, response):
+        """
+        Store the ETag and payload of a resource, or forget it when the service no longer gives an ETag
+
+        :param URLDest: path to URI, without query or fragment
+        :param response: response of the service, as given by restore
+        """
+        if response.getheader('X-Redfish-Not-Modified') is not None:
+            return
+        etag = response.getheader('ETag')
+        if response.status != 200 or etag is None:
+            if self.resources.pop(URLDest, None) is not None:
+                self.modified = True
+            return
+        self.resources[URLDest] = {'etag': etag, 'body': response.text,
+                                   'headers': {x: response.getheader(x) for x in recorded_headers if x != 'ETag' and response.getheader(x) is not None}}
+        self.modified = True
+
+    def getResult(self, URI, response):
+        """
+        Get the stored validation result of a resource, if the service did not modify it since
+
+        :param URI: path to URI
+        :param response: response of the service, as given by restore
+        :return: dict with the counts, messages, errors and warnings of the resource, or None
+        """
+        etag = response.getheader('X-Redfish-Not-Modified') if response is not None else None
+        result = self.resources.get(URI, {}).get('result', {})
+        if etag is None or result.get('etag') != etag or result.get('fingerprint') != self.fingerprint:
+            return None
+        self.reused += 1
+        return decodeResult(result)
+
+    def storeResult(self, URI, response, counts, messages, errors, warns):
+        """
+        Store the validation result of a resource, along with its ETag
+        """
+        entry = self.resources.get(URI)
+        if response is None or entry is None or response.getheader('ETag') != entry['etag']:
+            return
+        entry['result'] = dict(encodeResult(counts, messages, errors, warns), etag=entry['etag'], fingerprint=self.fingerprint)
+        self.modified = True
+
+    def save(self):
+        """
+        Write the store to disk, if it has been modified
+        """
+        if self.modified and writeStore(self.filename, {'version': ETagStore.store_version, 'resources': self.resources}, 'ETag store'):
+            self.modified = False
+
+    def getStats(self):
+        return '{} conditional requests, {} not modified, {} results reused'.format(self.conditional, self.not_modified, self.reused)
+
+
+class ResultStore:
+    """
+    Validation results of the resources of a service, kept in between runs
+
+    A result is reused when the payload of its resource is the same as when it was stored; the whole store
+    is dropped when the fingerprint of the validation changes, such as with new schema files or another
+    version of the tool
+    """
+
+    store_version = 1
+
+    def __init__(self, filename, fingerprint):
+        self.filename = filename
+        self.fingerprint = fingerprint
+        store = readStore(filename, ResultStore.store_version, 'result store')
+        self.resources = store.get('resources', {}) if store.get('fingerprint') == fingerprint else {}
+        if store and not self.resources:
+            my_logger.info('Validation has changed since the results of {} were stored, validating every resource again'.format(filename))
+        self.modified = False
+        self.reused, self.validated = 0, 0
+
+    @staticmethod
+    def getPayloadHash(payload, response):
+        """
+        Get a digest of a payload, along with the headers of its response that are validated
+        """
+        headers = [response.getheader(x) for x in ['Allow', 'X-Redfish-Mockup']] if response is not None else []
+        return hashlib.sha256(json.dumps([payload, headers], sort_keys=True, default=str).encode()).hexdigest()
+
+    def getResult(self, URI, payload, response):
+        """
+        Get the stored validation result of a resource, if its payload has not changed since
+
+        :param URI: path to URI
+        :param payload: decoded payload
+        :param response: response of the payload, or None
+        :return: dict with the counts, messages, errors and warnings of the resource, or None
+        """
+        result = self.resources.get(URI)
+        if result is None or result['hash'] != self.getPayloadHash(payload, response):
+            return None
+        self.reused += 1
+        return decodeResult(result)
+
+    def storeResult(self, URI, payload, response, counts, messages, errors, warns):
+        """
+        Store the validation result of a resource, along with the digest of its payload
+        """
+        self.resources[URI] = dict(encodeResult(counts, messages, errors, warns), hash=self.getPayloadHash(payload, response))
+        self.validated += 1
+        self.modified = True
+
+    def save(self):
+        """
+        Write the store to disk, if it has been modified
+        """
+        if self.modified and writeStore(self.filename, {'version': ResultStore.store_version, 'fingerprint': self.fingerprint,
+                                                        'resources': self.resources}, 'result store'):
+            self.modified = False
+
+    def getStats(self):
+        return '{} results reused, {} resources validated'.format(self.reused, self.validated)
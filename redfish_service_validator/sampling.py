@@ -0,0 +1,126 @@
+# Copyright Notice:
+# Copyright 2016-2020 DMTF. All rights reserved.
+# License: BSD 3-Clause License. For full text see link: https://github.com/DMTF/Redfish-Service-Validator/blob/master/LICENSE.md
+
+from collections import namedtuple, OrderedDict
+from fnmatch import fnmatchcase
+import random
+
+import logging
+my_logger = logging.getLogger(__name__)
+
+SamplingRule = namedtuple("SamplingRule", ["Pattern", "Policy", "Size"])
+
+DEFAULT_SAMPLING = 'LogEntry=first:15'
+
+sampling_policies = ['first', 'reservoir', 'stratified']
+
+
+def parseSamplingRules(text):
+    """
+    Parses sampling rules, such as "LogEntry=first:15;/redfish/v1/Chassis/*/Sensors/*=reservoir:20"
+
+    A pattern starting with / is matched against the URIs of links, any other against the types of links
+
+    :param text: rules separated by semicolons
+    :return: list of SamplingRule, in order
+    """
+    rules = []
+    for item in (text or '').split(';'):
+        if item.strip() == '':
+            continue
+        pattern, _, policy = item.rpartition('=')
+        policy, _, size = policy.partition(':')
+        if pattern.strip() == '' or policy.strip() not in sampling_policies or not size.strip().isdigit():
+            raise ValueError('Sampling rule "{}" is not of the form pattern=policy:size, with a policy among {}'.format(item, sampling_policies))
+        rules.append(SamplingRule(pattern.strip(), policy.strip(), int(size)))
+    return rules
+
+
+def getLinkUri(link):
+    return link.Value.get('@odata.id', link.Value.get('Uri')) if isinstance(link.Value, dict) else None
+
+
+def matchSamplingRule(rules, link):
+    """
+    Finds the first rule matching a link, by its URI or by its type
+
+    :param rules: list of SamplingRule
+    :param link: RedfishObject of the link
+    :return: SamplingRule, or None
+    """
+    for rule in rules:
+        if rule.Pattern.startswith('/'):
+            uri = getLinkUri(link)
+            if uri is not None and fnmatchcase(uri, rule.Pattern):
+                return rule
+        elif rule.Pattern in link.Type.fulltype:
+            return rule
+    return None
+
+
+def sampleFirst(links, size):
+    return links[:size]
+
+
+def sampleReservoir(links, size, rng):
+    """
+    Picks links at random with a reservoir, keeping them in their order
+    """
+    reservoir = list(range(min(size, len(links))))
+    for num in range(size, len(links)):
+        pick = rng.randint(0, num)
+        if pick < size:
+            reservoir[pick] = num
+    return [links[x] for x in sorted(reservoir)]
+
+
+def sampleStratified(links, size, getStratum):
+    """
+    Keeps the first links of each stratum, such as the @odata.type of their resources
+    """
+    strata = {}
+    sampled = []
+    for link in links:
+        stratum = getStratum(link)
+        if strata.get(stratum, 0) < size:
+            strata[stratum] = strata.get(stratum, 0) + 1
+            sampled.append(link)
+    return sampled
+
+
+def sampleLinks(rules, links, seed=0, key='', getStratum=None):
+    """
+    Samples the links of a resource with the rules matching them
+
+    Links no rule matches are all kept, ahead of the sampled ones
+
+    :param rules: list of SamplingRule
+    :param links: list of RedfishObject links
+    :param seed: seed of the reservoir policy, along with the key
+    :param key: name of the resource the links come from, so each one is sampled the same on every run
+    :param getStratum: function giving the stratum of a link, for the stratified policy; its type by default
+    :return: list of links kept, dict of notes by the id of each sampled link, and list of notes of the rules that left links out
+    """
+    if getStratum is None:
+        getStratum = lambda link: link.Type.fulltype
+    groups = OrderedDict()
+    for link in links:
+        groups.setdefault(matchSamplingRule(rules, link), []).append(link)
+
+    kept, notes, summary = groups.pop(None, []), {}, []
+    for rule, members in groups.items():
+        if rule.Policy == 'reservoir':
+            sampled = sampleReservoir(members, rule.Size, random.Random('{}:{}:{}'.format(seed, key, rule.Pattern)))
+        elif rule.Policy == 'stratified':
+            sampled = sampleStratified(members, rule.Size, getStratum)
+        else:
+            sampled = sampleFirst(members, rule.Size)
+        kept.extend(sampled)
+        if len(sampled) < len(members):
+            note = '{} {} {} of {}'.format(rule.Pattern, rule.Policy, len(sampled), len(members))
+            my_logger.info('Sampled links: {}'.format(note))
+            summary.append(note)
+            for link in sampled:
+                notes[id(link)] = 'Sampled: {}'.format(note)
+    return kept, notes, summary
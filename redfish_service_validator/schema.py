@@ -2,6 +2,7 @@
 # Copyright 2016-2020 DMTF. All rights reserved.
 # License: BSD 3-Clause License. For full text see link: https://github.com/DMTF/Redfish-Service-Validator/blob/master/LICENSE.md
 
+from bisect import bisect_right
 from collections import namedtuple
 from re import split
 from bs4 import BeautifulSoup
@@ -217,6 +218,7 @@ class rfSchema:
         self.context = context
         self.origin = origin
         self.name = name
+        self.type_versions = None
 
     def getSchemaFromReference(self, namespace):
         """getSchemaFromReference
@@ -297,8 +299,6 @@ class rfSchema:
         :param acquiredtype: Type available
         :param limit: Version string limit (full namespace or just version 'v1_x_x')
         """
-        typelist = list()
-
         if limit is not None:
             if getVersion(limit) is None:
                 if 'Collection' not in limit:
@@ -309,22 +309,31 @@ class rfSchema:
             else:
                 limit = getVersion(limit)
 
-        for schema in self.soup.find_all('Schema'):
-            newNamespace = schema.get('Namespace')
-            if limit is not None:
-                if getVersion(newNamespace) is None:
-                    continue
-                if splitVersionString(newNamespace) > splitVersionString(limit):
-                    continue
-            if schema.find(['EntityType', 'ComplexType'], attrs={'Name': getType(acquiredtype)}, recursive=False):
-                typelist.append(splitVersionString(newNamespace))
-
-        if len(typelist) > 1:
-            for ns in reversed(sorted(typelist)):
-                my_logger.debug(
-                    "{}   {}".format(ns, getType(acquiredtype)))
-                acquiredtype = getNamespaceUnversioned(acquiredtype) + '.v{}_{}_{}'.format(*ns) + '.' + getType(acquiredtype)
-                return acquiredtype
+        # index the versions of each type once, as ascending versions and a count of unversioned namespaces
+        if self.type_versions is None:
+            self.type_versions = {}
+            for schema in self.soup.find_all('Schema'):
+                newNamespace = schema.get('Namespace')
+                for typetag in schema.find_all(['EntityType', 'ComplexType'], recursive=False):
+                    versions, unversioned = self.type_versions.get(typetag.get('Name'), ([], 0))
+                    versions.append(splitVersionString(newNamespace))
+                    self.type_versions[typetag.get('Name')] = (versions, unversioned + (getVersion(newNamespace) is None))
+            for versions, _ in self.type_versions.values():
+                versions.sort()
+
+        versions, unversioned = self.type_versions.get(getType(acquiredtype), ([], 0))
+        if limit is not None:
+            # unversioned namespaces parse as the lowest version, and do not count against a limit
+            n = bisect_right(versions, splitVersionString(limit))
+            count = n - unversioned
+        else:
+            n = count = len(versions)
+
+        if count > 1:
+            ns = versions[n - 1]
+            my_logger.debug(
+                "{}   {}".format(ns, getType(acquiredtype)))
+            acquiredtype = getNamespaceUnversioned(acquiredtype) + '.v{}_{}_{}'.format(*ns) + '.' + getType(acquiredtype)
         return acquiredtype
 
 
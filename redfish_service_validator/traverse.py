@@ -3,22 +3,29 @@
 # License: BSD 3-Clause License. For full text see link: https://github.com/DMTF/Redfish-Service-Validator/blob/master/LICENSE.md
 
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from functools import lru_cache
 from urllib.parse import urlparse, urlunparse
 from http.client import responses
 import os
+import threading
 
 import redfish as rf
 import requests
 import redfish_service_validator.catalog as catalog
+import redfish_service_validator.sampling as sampling
+from redfish_service_validator.cache import ResponseCache
 from redfish_service_validator.helper import navigateJsonFragment, splitVersionString
 from redfish_service_validator.metadata import Metadata
+from redfish_service_validator.mockup import MockupClient, MockupIndex, MockupRecorder
+from redfish_service_validator.revalidation import ETagStore, ResultStore, getValidationFingerprint
 
 import logging
 my_logger = logging.getLogger(__name__)
 traverseLogger = my_logger
 
+request_headers = {"Accept-Encoding": "*"}
+
 # dictionary to hold sampling notation strings for URIs
 class AuthenticationError(Exception):
     """Exception used for failed basic auth or token auth"""
@@ -31,6 +38,148 @@ def getLogger():
     """
     return my_logger
 
+
+class ConcurrencyWindow:
+    """
+    Number of requests let in flight to the service at once, adjusted from its responses
+
+    The window grows by one request each time a full window of responses comes back fine, and is halved
+    when the service answers 429 or 503, fails to answer, or gets much slower than its average latency
+    """
+    def __init__(self, maximum, minimum=1, latency_factor=3, latency_floor=0.1):
+        """Init
+
+        Args:
+            maximum (int): Largest window, as the number of threads making requests
+            minimum (int): Smallest window, and the one to start with
+            latency_factor (float): How many times its average latency a response may take before the window is halved
+            latency_floor (float): Latency in seconds under which a response is never considered slow
+        """
+        self.maximum, self.minimum = maximum, minimum
+        self.latency_factor, self.latency_floor = latency_factor, latency_floor
+        self.size, self.active, self.successes = minimum, 0, 0
+        self.latency = None
+        self.start = self.last_decrease = datetime.now()
+        self.history = [(0.0, self.size, 'start')]
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        """
+        Waits for room in the window
+
+        :return: time the request is let through
+        """
+        with self.condition:
+            while self.active >= self.size:
+                self.condition.wait()
+            self.active += 1
+        return datetime.now()
+
+    def release(self, started, status, elapsed):
+        """
+        Frees the room of a request, and adjusts the window from its response
+
+        :param started: time the request was let through
+        :param status: HTTP status of the response, or None if there was none
+        :param elapsed: timedelta of the request
+        """
+        with self.condition:
+            self.active -= 1
+            seconds = elapsed.total_seconds()
+            reason = None
+            if status in [429, 503]:
+                reason = 'HTTP {}'.format(status)
+            elif status is None:
+                reason = 'no response'
+            elif self.latency is not None and seconds > max(self.latency * self.latency_factor, self.latency_floor):
+                reason = 'latency of {:.3f}s over an average of {:.3f}s'.format(seconds, self.latency)
+            if status is not None:
+                self.latency = seconds if self.latency is None else 0.8 * self.latency + 0.2 * seconds
+
+            # requests already in flight when the window was halved do not halve it again
+            if reason is not None and started >= self.last_decrease:
+                self.last_decrease = datetime.now()
+                self.resize(max(self.minimum, self.size // 2), reason)
+            elif reason is None:
+                self.successes += 1
+                if self.successes >= self.size and self.size < self.maximum:
+                    self.resize(self.size + 1, 'window of responses without congestion')
+            self.condition.notify_all()
+
+    def resize(self, size, reason):
+        self.successes = 0
+        if size == self.size:
+            return
+        when = (datetime.now() - self.start).total_seconds()
+        traverseLogger.info('Concurrency window: {} -> {} requests at {:.1f}s, after {}'.format(self.size, size, when, reason))
+        self.size = size
+        self.history.append((when, size, reason))
+
+    def getStats(self):
+        """
+        Get a summary of the window over the run, for the log
+
+        :return: string
+        """
+        sizes = [x[1] for x in self.history]
+        return 'final {}, largest {}, {} changes: {}'.format(
+            self.size, max(sizes), len(self.history) - 1, ', '.join('{:.1f}s={}'.format(x[0], x[1]) for x in self.history))
+
+
+class Prefetcher:
+    """
+    Requests resources of the service ahead of the validation, with a pool of threads
+
+    Only the requests run in the pool; responses are checked, and anything is logged,
+    when the validation gets to them, so results are the same as without prefetching.
+    How many requests are in flight at once follows a ConcurrencyWindow, up to the number of threads;
+    responses the validation never gets to, such as of links left out by sampling, are dropped, oldest first,
+    once more than a limited number of them are kept
+    """
+    def __init__(self, context, jobs, limit=None):
+        self.context = context
+        self.executor = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix='prefetch')
+        self.window = ConcurrencyWindow(jobs)
+        self.futures = {}
+        self.limit = limit if limit is not None else jobs * 16
+        self.requested, self.used, self.dropped = 0, 0, 0
+
+    def prefetch(self, URLDest, headers):
+        """
+        Starts the request of a URL, unless it is already in flight
+        """
+        if URLDest in self.futures:
+            return
+        while len(self.futures) >= self.limit:
+            self.futures.pop(next(iter(self.futures))).cancel()
+            self.dropped += 1
+        self.futures[URLDest] = self.executor.submit(self.request, URLDest, headers)
+        self.requested += 1
+
+    def request(self, URLDest, headers):
+        startTick = self.window.acquire()
+        response = None
+        try:
+            response = self.context.get(URLDest, headers=dict(headers))
+        finally:
+            elapsed = datetime.now() - startTick
+            self.window.release(startTick, response.status if response is not None else None, elapsed)
+        return response, elapsed
+
+    def get(self, URLDest, headers):
+        """
+        Returns the response of a URL and the time it took, waiting for its prefetched request or making it now
+        """
+        future = self.futures.pop(URLDest, None)
+        if future is None:
+            return self.request(URLDest, headers)
+        self.used += 1
+        return future.result()
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.futures = {}
+
 class rfService():
     def __init__(self, config):
         traverseLogger.info('Setting up service...')
@@ -44,6 +193,12 @@ class rfService():
         self.config['certificatebundle'] = None
         self.config['timeout'] = 10
 
+        self.cache = ResponseCache(self.config.get('response_cache_size', 100) * 1024 * 1024)
+        self.prefetcher = None
+        self.recorder = MockupRecorder(self.config['record']) if self.config.get('record', '') != '' else None
+        self.mockup = None
+        self.etags = None
+
         # Log into the service
         if not self.config['usessl'] and not self.config['forceauth']:
             if self.config['username'] not in ['', None] or self.config['password'] not in ['', None]:
@@ -61,8 +216,21 @@ class rfService():
             self.ext_proxies = {}
             if self.config['ext_http_proxy'] != '': self.ext_proxies['http'] = self.config['ext_http_proxy']
             if self.config['ext_https_proxy'] != '': self.ext_proxies['https'] = self.config['ext_https_proxy']
-        self.context = rf.redfish_client(base_url=rhost, username=user, password=passwd, timeout=self.config['timeout'], proxies=proxies)
-        self.context.login( auth = self.config['authtype'].lower() )
+        if self.config.get('offline', False):
+            # every resource comes from the mockup, without any connection to a service
+            if not os.path.exists(self.config.get('mockup', '')):
+                raise ValueError('Offline validation needs the folder or archive of a complete mockup, not "{}"'.format(self.config.get('mockup', '')))
+            traverseLogger.info('Validating mockup {} offline'.format(self.config['mockup']))
+            self.context = MockupClient(MockupIndex(self.config['mockup']))
+        else:
+            if self.config.get('mockup', '') != '':
+                self.mockup = MockupIndex(self.config['mockup'])
+            if self.config.get('etag_store', '') != '':
+                self.etags = ETagStore(self.config['etag_store'])
+            self.context = rf.redfish_client(base_url=rhost, username=user, password=passwd, timeout=self.config['timeout'], proxies=proxies)
+            self.context.login( auth = self.config['authtype'].lower() )
+            if self.config.get('jobs', 1) > 1:
+                self.prefetcher = Prefetcher(self.context, self.config['jobs'])
 
         # Go through $metadata and download any additional schema files needed
         success, data, response, delay = self.callResourceURI(Metadata.metadata_uri)
@@ -72,7 +240,8 @@ class rfService():
             self.metadata = Metadata(None, self, my_logger)
 
         # Build the data model based on cached schema files
-        self.catalog = catalog.SchemaCatalog(self.config['metadatafilepath'])
+        self.catalog = catalog.SchemaCatalog(self.config['metadatafilepath'], use_cache=self.config.get('schema_cache', False),
+                                             lazy=self.config.get('lazy_catalog', False), jobs=self.config.get('catalog_jobs', 1))
 
         target_version = 'n/a'
 
@@ -97,19 +266,183 @@ class rfService():
 
         self.service_root = data
 
+        # Request collections with their members expanded, if asked and supported
+        self.expand_query, self.expanded = None, 0
+        if self.config.get('expand', False) and not self.config.get('offline', False):
+            self.expand_query = self.getExpandQuery(data)
+            if self.expand_query is None:
+                traverseLogger.warning('Service does not advertise support for $expand of subordinate resources, requesting each member of collections')
+
+        self.sampling_rules = sampling.parseSamplingRules(self.config.get('sampling', sampling.DEFAULT_SAMPLING))
+
+        # Results of earlier runs stand for the resources that have not changed since, as long as the validation has not either
+        self.results = None
+        if self.etags is not None or self.config.get('result_store', '') != '':
+            fingerprint = getValidationFingerprint(self)
+            if self.etags is not None:
+                self.etags.fingerprint = fingerprint
+            if self.config.get('result_store', '') != '':
+                self.results = ResultStore(self.config['result_store'], fingerprint)
+
         self.active = True
 
 
     def close(self):
         self.active = False
+        if self.prefetcher is not None:
+            self.prefetcher.close()
+        if self.mockup is not None:
+            self.mockup.close()
+        if isinstance(self.context, MockupClient):
+            self.context.index.close()
+        if self.etags is not None:
+            self.etags.save()
+        if self.results is not None:
+            self.results.save()
+
+    def prefetchURIs(self, URILinks):
+        """
+        Requests the resources of URIs ahead, if the service has a pool of jobs
+
+        URIs already cached, outside of the service or given by the mockup are left to callResourceURI
+
+        param arg1: list of paths to URIs
+        """
+        if self.prefetcher is None:
+            return
+        for URILink in URILinks:
+            if URILink is None:
+                continue
+            URILink = URILink.rsplit('#', 1)[0]
+            scheme, netloc, path, params, query, fragment = urlparse(URILink)
+            if scheme != '' or netloc != '' or URILink in self.cache:
+                continue
+            URLDest = urlunparse((scheme, netloc, path, '', '', ''))
+            if self.mockup is not None and self.mockup.getKey(URLDest) is not None:
+                continue
+            self.prefetcher.prefetch(URLDest, self.etags.getRequestHeaders(URLDest, request_headers) if self.etags is not None else request_headers)
+
+    @staticmethod
+    def getExpandQuery(service_root):
+        """
+        Returns the query to expand the members of a collection, from the ExpandQuery features of the ServiceRoot
+
+        param arg1: payload of the ServiceRoot
+        return: query string, or None if $expand of subordinate resources is not supported
+        """
+        features = service_root.get('ProtocolFeaturesSupported', {}) if isinstance(service_root, dict) else {}
+        expand = features.get('ExpandQuery', {}) if isinstance(features, dict) else {}
+        if not isinstance(expand, dict) or expand.get('NoLinks') is not True:
+            return None
+        return '$expand=.($levels=1)' if expand.get('Levels') is True else '$expand=.'
+
+    def expandCollections(self, URILinks):
+        """
+        Requests collections with their members expanded, and caches each member as if it was requested on its own
+
+        Collections already cached, outside of the service or given by the mockup are left to callResourceURI
+
+        param arg1: list of paths to URIs of collections
+        """
+        if self.expand_query is None:
+            return
+        for URILink in URILinks:
+            if URILink is None or '#' in URILink or URILink in self.cache or urlparse(URILink)[:2] != ('', ''):
+                continue
+            if self.mockup is not None and self.mockup.getKey(URILink) is not None:
+                continue
+            success, data, response, elapsed = self.getResourceURI(URILink, self.expand_query)
+            if not success or response.status != 200 or not isinstance(data, dict) or not isinstance(data.get('Members'), list):
+                traverseLogger.warning('Expanded request of collection {} failed, requesting each member of collections'.format(URILink))
+                self.expand_query = None
+                return
+            members = {id(x): x for x in data['Members'] if isinstance(x, dict) and isinstance(x.get('@odata.id'), str) and len(x) > 1}
+            for member in members.values():
+                member_response = rf.rest.v1.StaticRestResponse(Status=200, Headers={'Content-Type': 'application/json', 'X-Redfish-Expanded': URILink}, Content=member)
+                self.cache.put(member['@odata.id'], (True, member, member_response, elapsed), pinned=self.isPinnedResource(member['@odata.id']))
+                if self.recorder is not None and '#' not in member['@odata.id']:
+                    self.recorder.record(member['@odata.id'], member_response, elapsed)
+            # the collection itself as it is without $expand
+            data = dict(data, Members=[{'@odata.id': x['@odata.id']} if id(x) in members else x for x in data['Members']])
+            response = rf.rest.v1.StaticRestResponse(Status=response.status, Headers=response.getheaders(), Content=data)
+            self.cache.put(URILink, (True, data, response, elapsed), pinned=self.isPinnedResource(URILink))
+            if self.recorder is not None:
+                self.recorder.record(URILink, response, elapsed)
+            self.expanded += len(members)
+            traverseLogger.debug('Expanded {} members of collection {}'.format(len(members), URILink))
+
+    def getCollectionPages(self, nextLink):
+        """
+        Follows the Members@odata.nextLink of a collection, one page at a time
+
+        Pages are not cached, so only the page being read is held in memory
+
+        param arg1: Members@odata.nextLink of the first page
+        return: generator of (URI of the page, success boolean, list of members)
+        """
+        seen = set()
+        while isinstance(nextLink, str) and nextLink not in seen:
+            seen.add(nextLink)
+            path, _, query_string = nextLink.partition('?')
+            success, data, response, elapsed = self.getResourceURI(path, query_string)
+            members = data.get('Members') if success and isinstance(data, dict) else None
+            if not isinstance(members, list):
+                yield nextLink, False, []
+                return
+            yield nextLink, True, members
+            nextLink = data.get('Members@odata.nextLink')
+
+    @staticmethod
+    def isPinnedResource(URILink):
+        """
+        Returns True if the result of an URI should stay cached for the whole run
+
+        Only the ServiceRoot, its service document and $metadata are requested again and again while validating;
+        registries and everything else stay within the limit of the cache
+        """
+        if URILink is None or urlparse(URILink)[:2] != ('', ''):
+            return False
+        return urlparse(URILink).path.rstrip('/') in ['/redfish', '/redfish/v1', '/redfish/v1/odata', Metadata.metadata_uri]
 
-    @lru_cache(maxsize=128)
     def callResourceURI(self, URILink):
+        """
+        Makes a call to a given URI or URL, unless its result is already cached
+
+        param arg1: path to URI "/example/1", or URL "http://example.com"
+        return: (success boolean, data, request status code)
+        """
+        if URILink is not None and '#' in URILink and urlparse(URILink)[:2] == ('', ''):
+            return self.getFragmentURI(URILink)
+        result = self.cache.get(URILink)
+        if result is None:
+            result = self.getResourceURI(URILink)
+            self.cache.put(URILink, result, pinned=self.isPinnedResource(URILink))
+        return result
+
+    def getFragmentURI(self, URILink):
+        """
+        Resolves a URI with a JSON pointer fragment over its base document, so the document is requested only once
+
+        param arg1: path to URI with a fragment "/example/1#/Items/0"
+        return: (success boolean, data, request status code)
+        """
+        success, data, response, elapsed = self.callResourceURI(URILink.rsplit('#', 1)[0])
+        contenttype = response.getheader('content-type') if success else None
+        if contenttype is None or 'application/json' not in contenttype:
+            return success, data, response, elapsed
+        decoded = navigateJsonFragment(data, URILink)
+        if decoded is None:
+            traverseLogger.error(
+                    "The JSON pointer in the fragment of this URI is not constructed properly: {}".format(URILink))
+        return decoded is not None, decoded, response, elapsed
+
+    def getResourceURI(self, URILink, query_string=''):
         traverseLogger = my_logger
         """
         Makes a call to a given URI or URL
 
         param arg1: path to URI "/example/1", or URL "http://example.com"
+        param arg2: query to add to a path to URI, such as "$expand=."
         return: (success boolean, data, request status code)
         """
         # rs-assertions: 6.4.1, including accept, content-type and odata-versions
@@ -128,7 +461,7 @@ class rfService():
         scheme, netloc, path, params, query, fragment = urlparse(URILink)
         inService = scheme == '' and netloc == ''
         if inService:
-            URLDest = urlunparse((scheme, netloc, path, '', '', '')) #URILink
+            URLDest = urlunparse((scheme, netloc, path, '', query_string, '')) #URILink
         else:
             URLDest = urlunparse((scheme, netloc, path, params, query, fragment))
 
@@ -153,7 +486,10 @@ class rfService():
             auth = None
 
         # only send token when we're required to chkauth, during a Session, and on Service and Secure
-        headers = {"Accept-Encoding": "*"}
+        headers = dict(request_headers)
+        revalidate = self.etags is not None and inService and query_string == ''
+        if revalidate:
+            headers = self.etags.getRequestHeaders(URLDest, headers)
 
         certVal = ChkCertBundle if ChkCert and ChkCertBundle not in [None, ""] else ChkCert
 
@@ -162,20 +498,27 @@ class rfService():
             'out of service ' if not inService else '', AuthType, UseSSL, URILink, headers))
         response = None
         try:
-            startTick = datetime.now()
-            mockup_file_path = os.path.join(config['mockup'], URLDest.replace('/redfish/v1/', '', 1).strip('/'), 'index.json')
+            startTick, requestElapsed = datetime.now(), None
+            # offline, the whole mockup stands in for the service instead
+            mockup_key = self.mockup.getKey(URLDest) if self.mockup is not None and inService and query_string == '' else None
             if not inService:
                 req = requests.get(URLDest, proxies=self.ext_proxies, verify=False)
                 content = req.json if not isXML else req.text
                 response = rf.rest.v1.StaticRestResponse(Status=req.status_code, Headers={x:req.headers[x] for x in req.headers}, Content=req.text)
-            elif config['mockup'] != '' and os.path.isfile(mockup_file_path):
-                content = {}
-                with open(mockup_file_path) as mockup_file:
-                    content = json.load(mockup_file)
-                response = rf.rest.v1.StaticRestResponse(Status=200, Headers={'Content-Type': 'application/json', 'X-Redfish-Mockup': 'true'}, Content=content)
+            elif mockup_key is not None:
+                response = self.mockup.getResponse(mockup_key)
+            elif self.prefetcher is not None:
+                # time of the request itself, which may have been made ahead
+                response, requestElapsed = self.prefetcher.get(URLDest, headers)
             else:
                 response = self.context.get(URLDest, headers=headers)
-            elapsed = datetime.now() - startTick
+            elapsed = datetime.now() - startTick if requestElapsed is None else requestElapsed
+            if revalidate and mockup_key is None:
+                # not modified since the last run, its stored payload stands in for the response
+                response = self.etags.restore(URLDest, response)
+                self.etags.update(URLDest, response)
+            if self.recorder is not None and inService and mockup_key is None and query_string == '':
+                self.recorder.record(URLDest, response, elapsed)
             statusCode = response.status
 
             traverseLogger.debug('{}, {},\nTIME ELAPSED: {}'.format(statusCode, response.getheaders(), elapsed))
@@ -3,11 +3,13 @@
 # License: BSD 3-Clause License. For full text see link: https://github.com/DMTF/Redfish-Service-Validator/blob/master/LICENSE.md
 
 import logging
+import threading
 from collections import Counter, OrderedDict
 from io import StringIO
 
 import redfish_service_validator.traverse as traverse
 import redfish_service_validator.catalog as catalog
+import redfish_service_validator.sampling as sampling
 from redfish_service_validator.validateRedfish import checkPropertyConformance, displayValue
 from redfish_service_validator.helper import getNamespace, getType, createContext, checkPayloadConformance, navigateJsonFragment, create_entry
 
@@ -17,6 +19,17 @@ class WarnFilter(logging.Filter):
        def filter(self, rec):
            return rec.levelno == logging.WARN
 
+class ThreadFilter(logging.Filter):
+       """
+       Keeps the records of one thread, as validations of several services may run at once and share the root logger
+       """
+       def __init__(self):
+           super().__init__()
+           self.thread = threading.get_ident()
+
+       def filter(self, rec):
+           return rec.thread == self.thread
+
 fmt = logging.Formatter('%(levelname)s - %(message)s')
 
 def create_logging_capture(this_logger):
@@ -25,11 +38,13 @@ def create_logging_capture(this_logger):
 
     errh = logging.StreamHandler(errorMessages)
     errh.setLevel(logging.ERROR)
+    errh.addFilter(ThreadFilter())
     errh.setFormatter(fmt)
 
     warnh = logging.StreamHandler(warnMessages)
     warnh.setLevel(logging.WARN)
     warnh.addFilter(WarnFilter())
+    warnh.addFilter(ThreadFilter())
     warnh.setFormatter(fmt)
 
     this_logger.addHandler(errh)
@@ -45,6 +60,17 @@ def get_my_capture(this_logger, handler):
     return strings
 
 
+def requestLinks(service, redfish_obj):
+    """
+    Gets the links of a resource, and requests the resources they link to ahead, as checking its properties gets them in order
+    """
+    links = redfish_obj.getLinks()
+    service.expandCollections([link.Value.get('@odata.id') for link in links if isinstance(link.Value, dict) and not link.Type.AutoExpand
+                               and any(str(x).endswith('.ResourceCollection') for x in link.Type.getTypeTree())])
+    service.prefetchURIs([link.Value.get('@odata.id') for link in links if isinstance(link.Value, dict) and not link.Type.AutoExpand])
+    return links
+
+
 def validateSingleURI(service, URI, uriName='', expectedType=None, expectedJson=None, parent=None):
     # rs-assertion: 9.4.1
     # Initial startup here
@@ -122,6 +148,27 @@ def validateSingleURI(service, URI, uriName='', expectedType=None, expectedJson=
 
     counts['passGet'] += 1
 
+    # not modified since the last run, so its last result stands, also when its payload came along with a link;
+    # results of fragments also depend on their parent, so they are never reused
+    reusable = '#' not in URI
+    etag_response = response
+    if service.etags is not None and expectedJson is not None:
+        cached = service.cache.get(URI) if reusable and URI in service.cache else None
+        etag_response = cached[2] if cached is not None and cached[0] and cached[1] == expectedJson else None
+    stored = service.etags.getResult(URI, etag_response) if service.etags is not None and reusable else None
+    if stored is None and service.results is not None and reusable:
+        stored = service.results.getResult(URI, me['payload'], response)
+    if stored is not None:
+        counts.clear()
+        counts.update(stored['counts'])
+        messages.clear()
+        messages.update(stored['messages'])
+        me['uri'], me['context'], me['origin'], me['success'] = str(URI), createContext(me['fulltype']), redfish_obj.Type.owner.parent_doc.name, True
+        get_my_capture(my_logger, whandler), get_my_capture(my_logger, ehandler)
+        me['warns'], me['errors'] = stored['warns'], stored['errors']
+        my_logger.info("\t Type (%s), unchanged, result of the last run reused", me['fulltype'])
+        return True, counts, results, requestLinks(service, redfish_obj), redfish_obj
+
     # verify odata_id properly resolves to its parent if holding fragment
     odata_id = me['payload'].get('@odata.id')
     if odata_id is None:
@@ -192,6 +239,11 @@ def validateSingleURI(service, URI, uriName='', expectedType=None, expectedJson=
         my_logger.warning('Response payload loaded from mockup, not the service under test')
         counts['warnMockupUsed'] += 1
 
+    if response and response.getheader('X-Redfish-Expanded'):
+        # the service sends no headers for each member of an expanded collection, so there are none to check
+        my_logger.info('Response payload taken from the expanded collection {}, its headers are not checked'.format(response.getheader('X-Redfish-Expanded')))
+        counts['skipExpandedHeaders'] += 1
+
     if not successPayload:
         counts['failPayloadError'] += 1
         my_logger.error(str(URI) + ': payload error, @odata property non-conformant',)
@@ -204,6 +256,8 @@ def validateSingleURI(service, URI, uriName='', expectedType=None, expectedJson=
 
     my_logger.info("\t Type (%s), GET SUCCESS (time: %s)", me['fulltype'], me['rtime'])
     
+    links = requestLinks(service, redfish_obj)
+
     for prop_name, prop in redfish_obj.properties.items():
         try:
             if not prop.HasSchema and not prop.Exists:
@@ -281,13 +335,18 @@ def validateSingleURI(service, URI, uriName='', expectedType=None, expectedJson=
             break
     my_logger.info("\t {}".format('PASS' if pass_val else' FAIL...'))
 
+    if service.etags is not None and reusable:
+        service.etags.storeResult(URI, etag_response, counts, messages, results[uriName]['errors'], results[uriName]['warns'])
+    if service.results is not None and reusable:
+        service.results.storeResult(URI, me['payload'], response, counts, messages, results[uriName]['errors'], results[uriName]['warns'])
+
     my_logger.verbose1('%s, %s', SchemaFullType, counts)
 
     # Get all links available
 
-    my_logger.debug(redfish_obj.getLinks())
+    my_logger.debug(links)
 
-    return True, counts, results, redfish_obj.getLinks(), redfish_obj
+    return True, counts, results, links, redfish_obj
 
 
 def validateURITree(service, URI, uriName, expectedType=None, expectedJson=None, parent=None, allLinks=None, inAnnotation=False):
@@ -318,9 +377,32 @@ def validateURITree(service, URI, uriName, expectedType=None, expectedJson=None,
 
     # If successful...
     if validateSuccess:
+        # Sample the links of large collections, such as log entries
+        untyped = []
+        def getStratum(link):
+            # members are cached once their links are checked, or expanded; sampling never requests them again
+            uri = sampling.getLinkUri(link)
+            if uri is not None and uri in service.cache:
+                success, data, _, _ = service.callResourceURI(uri)
+                if success and isinstance(data, dict) and '@odata.type' in data:
+                    return data['@odata.type']
+            untyped.append(link)
+            return link.Type.fulltype
+
+        num_links = len(links)
+        links, sample_notes, sample_summary = sampling.sampleLinks(service.sampling_rules, links, service.config.get('sampling_seed', 0), URI, getStratum)
+        if untyped:
+            my_logger.warning('{}: {} links sampled by the type of their link, as the types of their resources are not known; '
+                              'a larger response_cache_size keeps them'.format(URI, len(untyped)))
+        if sample_summary:
+            results[uriName]['samplemapped'] = 'Sampled members: {}'.format('; '.join(sample_summary))
+            counts['skipSampled'] += num_links - len(links)
+            # noted on the links themselves, as references are followed from the top of the tree
+            for link in links:
+                if id(link) in sample_notes:
+                    link.SampleNote = sample_notes[id(link)]
+
         # Bring Registries to Front if possible
-        log_entries = [x for x in links if 'LogEntry' in x.Type.fulltype]
-        links = [x for x in links if 'LogEntry' not in x.Type.fulltype] + log_entries[:15] # Pare down logentries
 
         for link in sorted(links, key=lambda x: (x.Type.fulltype != 'Registries.Registries')):
             if link is None or link.Value is None:
@@ -366,6 +448,8 @@ def validateURITree(service, URI, uriName, expectedType=None, expectedJson=None,
             else:
                 returnVal = validateURITree(service, link_destination, uriName + ' -> ' + link.Name, parent=parent, allLinks=allLinks, inAnnotation=link.InAnnotation)
             success, linkCounts, linkResults, xlinks, xobj = returnVal
+            if getattr(link, 'SampleNote', None) and uriName + ' -> ' + link.Name in linkResults:
+                linkResults[uriName + ' -> ' + link.Name]['samplemapped'] = link.SampleNote
 
             my_logger.verbose1('%s, %s', link.Name, linkCounts)
 
@@ -374,6 +458,43 @@ def validateURITree(service, URI, uriName, expectedType=None, expectedJson=None,
                 counts['unvalidated'] += 1
             results.update(linkResults)
 
+        # Follow the members of the next pages of a collection, up to a limit
+        member_limit = service.config.get('paged_member_limit', 0)
+        next_link = thisobj.payload.get('Members@odata.nextLink')
+        if member_limit > 0 and isinstance(next_link, str):
+            num, followed = len(thisobj.payload.get('Members', [])), 0
+            for page_uri, page_success, members in service.getCollectionPages(next_link):
+                if not page_success:
+                    errmsg = 'Could not get the page of members {} of collection {}'.format(page_uri, URI)
+                    my_logger.error(errmsg)
+                    results[uriName]['errors'] += '\n' + errmsg
+                    counts['errorNextLink'] += 1
+                    break
+                for member in members:
+                    if followed >= member_limit:
+                        break
+                    link_destination = member.get('@odata.id') if isinstance(member, dict) else None
+                    link_name = 'Members#{}'.format(num)
+                    num += 1
+                    if link_destination is None:
+                        errmsg = 'URI for member {} of {} is missing'.format(link_name, uriName)
+                        my_logger.error(errmsg)
+                        results[uriName]['errors'] += '\n' + errmsg
+                        counts['errorMissingOdata'] += 1
+                        continue
+                    if link_destination in allLinks:
+                        counts['repeat'] += 1
+                        continue
+                    followed += 1
+                    success, linkCounts, linkResults, xlinks, xobj = validateURITree(service, link_destination, uriName + ' -> ' + link_name, parent=parent, allLinks=allLinks)
+
+                    refLinks.extend(xlinks)
+                    if not success:
+                        counts['unvalidated'] += 1
+                    results.update(linkResults)
+                if followed >= member_limit:
+                    break
+
     if top:
         # TODO: consolidate above code block with this
         for link in refLinks:
@@ -414,6 +535,8 @@ def validateURITree(service, URI, uriName, expectedType=None, expectedJson=None,
             # Using None instead of refparent simply because the parent is not where the link comes from
             returnVal = validateURITree(service, link_destination, uriName + ' -> ' + link.Name, my_link_type, my_data, None, allLinks)
             success, linkCounts, linkResults, xlinks, xobj = returnVal
+            if getattr(link, 'SampleNote', None) and uriName + ' -> ' + link.Name in linkResults:
+                linkResults[uriName + ' -> ' + link.Name]['samplemapped'] = link.SampleNote
             # refLinks.update(xlinks)
 
             if not success:
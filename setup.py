@@ -29,7 +29,8 @@ setup(
     entry_points={
         'console_scripts': [
             'rf_service_validator=redfish_service_validator.RedfishServiceValidator:main',
-            'rf_service_validator_gui=redfish_service_validator.RedfishServiceValidatorGui:main'
+            'rf_service_validator_gui=redfish_service_validator.RedfishServiceValidatorGui:main',
+            'rf_mockup_validator=redfish_service_validator.RedfishServiceValidator:mockups_main'
         ]
     },
     install_requires=[
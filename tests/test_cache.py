@@ -0,0 +1,74 @@
+# Copyright Notice:
+# Copyright 2017-2019 DMTF. All rights reserved.
+# License: BSD 3-Clause License. For full text see link: https://github.com/DMTF/Redfish-Service-Validator/blob/master/LICENSE.md
+#
+# Unit tests for cache.py and the response caching of traverse.py
+#
+
+import unittest
+import sys
+
+sys.path.append('../')
+
+import redfish as rf
+
+import redfish_service_validator.cache as cache
+import redfish_service_validator.traverse as traverse
+
+
+def make_result(body):
+    response = rf.rest.v1.StaticRestResponse(Status=200, Headers={'Content-Type': 'application/json'}, Content=body)
+    return True, body if isinstance(body, dict) else {}, response, 0
+
+
+class TestCache(unittest.TestCase):
+    def test_response_cache(self):
+        my_cache = cache.ResponseCache(100)
+        my_cache.put('/redfish/v1', make_result('x' * 80), pinned=True)
+        my_cache.put('/redfish/v1/A', make_result('x' * 60))
+        my_cache.put('/redfish/v1/B', make_result('x' * 30))
+
+        self.assertIsNotNone(my_cache.get('/redfish/v1/A'))
+        my_cache.put('/redfish/v1/C', make_result('x' * 30))
+        # B is the least recently used, pinned results do not count
+        self.assertIsNone(my_cache.get('/redfish/v1/B'))
+        self.assertIsNotNone(my_cache.get('/redfish/v1/A'))
+        self.assertIsNotNone(my_cache.get('/redfish/v1'))
+        self.assertEqual((my_cache.hits, my_cache.misses, my_cache.evictions), (3, 1, 1))
+        self.assertEqual(my_cache.size, 90)
+
+        my_cache.put('/redfish/v1/D', make_result('x' * 200))
+        self.assertNotIn('/redfish/v1/D', my_cache)
+        self.assertEqual(len(my_cache), 3)
+
+    def test_pinned_resource(self):
+        for uri in ['/redfish/v1', '/redfish/v1/', '/redfish/v1/$metadata', '/redfish/v1/odata']:
+            self.assertTrue(traverse.rfService.isPinnedResource(uri), uri)
+        # registries are kept within the limit of the cache, like any other resource
+        for uri in ['/redfish/v1/Registries', '/redfish/v1/Registries/Base', '/registries/Base.1.0.0.json',
+                    '/redfish/v1/Systems/1/Bios/BiosAttributeRegistry', 'http://example.com/redfish/v1', None]:
+            self.assertFalse(traverse.rfService.isPinnedResource(uri), uri)
+
+    def test_fragment_uri(self):
+        class Service(traverse.rfService):
+            def __init__(self):
+                self.cache = cache.ResponseCache(1024)
+                self.requested = []
+
+            def getResourceURI(self, URILink):
+                self.requested.append(URILink)
+                return make_result({'PowerSupplies': [{'Name': 'A'}, {'Name': 'B'}]})
+
+        my_service = Service()
+        success, data, _, _ = my_service.callResourceURI('/redfish/v1/Chassis/1/Power#/PowerSupplies/1')
+        self.assertTrue(success)
+        self.assertEqual(data, {'Name': 'B'})
+        success, data, _, _ = my_service.callResourceURI('/redfish/v1/Chassis/1/Power#/PowerSupplies/0')
+        self.assertEqual(data, {'Name': 'A'})
+        success, data, _, _ = my_service.callResourceURI('/redfish/v1/Chassis/1/Power#/PowerSupplies/2')
+        self.assertFalse(success)
+        self.assertEqual(my_service.requested, ['/redfish/v1/Chassis/1/Power'])
+
+
+if __name__ == '__main__':
+    unittest.main()
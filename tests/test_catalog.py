@@ -7,7 +7,10 @@
 
 import unittest
 import sys
+import os
 import pprint
+import shutil
+import tempfile
 
 sys.path.append('../')
 
@@ -46,6 +49,90 @@ class TestCatalog(unittest.TestCase):
         my_type = my_catalog.getTypeInCatalog('Example.v1_2_0.Links')
         # OK
     
+    def test_catalog_cache(self):
+        print('\n')
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            schema_dir = os.path.join(tmp_dir, 'schemas')
+            shutil.copytree('./tests/testdata/schemas/', schema_dir)
+
+            my_catalog = catalog.SchemaCatalog(schema_dir, use_cache=True)
+            self.assertEqual((my_catalog.cache.hits, my_catalog.cache.misses), (0, 2))
+            self.assertTrue(os.path.isfile(os.path.join(schema_dir, '.catalog_cache', 'index.json')))
+
+            my_cached_catalog = catalog.SchemaCatalog(schema_dir, use_cache=True)
+            self.assertEqual((my_cached_catalog.cache.hits, my_cached_catalog.cache.misses), (2, 0))
+            self.assertEqual(my_cached_catalog.alias, my_catalog.alias)
+            self.assertEqual(list(my_cached_catalog.catalog_by_class), list(my_catalog.catalog_by_class))
+            my_type = my_cached_catalog.getTypeInCatalog('Example.v1_7_0.Example')
+            self.assertEqual(len(my_type.getUris()), 3)
+            self.assertTrue(my_type.CanUpdate)
+
+            # touching a file only rehashes it, changing it parses it again
+            os.utime(os.path.join(schema_dir, 'Example_v1.xml'), ns=(0, 0))
+            my_cached_catalog = catalog.SchemaCatalog(schema_dir, use_cache=True)
+            self.assertEqual((my_cached_catalog.cache.hits, my_cached_catalog.cache.misses), (2, 0))
+            with open(os.path.join(schema_dir, 'Example_v1.xml'), 'a') as f:
+                f.write('\n')
+            my_cached_catalog = catalog.SchemaCatalog(schema_dir, use_cache=True)
+            self.assertEqual((my_cached_catalog.cache.hits, my_cached_catalog.cache.misses), (1, 1))
+
+    def test_lazy_catalog(self):
+        print('\n')
+        my_catalog = catalog.SchemaCatalog('./tests/testdata/schemas/')
+        my_lazy_catalog = catalog.SchemaCatalog('./tests/testdata/schemas/', lazy=True)
+        self.assertEqual(len(my_lazy_catalog.catalog), 0)
+        self.assertEqual(my_lazy_catalog.alias, my_catalog.alias)
+        self.assertEqual(my_lazy_catalog.catalog_by_class, my_catalog.catalog_by_class)
+
+        my_lazy_catalog.getSchemaDocByClass('ExampleResource.v1_0_0')
+        self.assertEqual(list(my_lazy_catalog.catalog), ['ExampleResource_v1.xml'])
+        self.assertRaises(catalog.MissingSchemaError, my_lazy_catalog.getSchemaDocByClass, 'NotExample')
+
+        my_type = my_lazy_catalog.getTypeInCatalog('Example.v1_7_0.Example')
+        self.assertEqual(len(my_type.getUris()), 3)
+        self.assertEqual(len(my_lazy_catalog.catalog), 2)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            schema_dir = os.path.join(tmp_dir, 'schemas')
+            shutil.copytree('./tests/testdata/schemas/', schema_dir)
+            catalog.SchemaCatalog(schema_dir, use_cache=True, lazy=True)
+            my_lazy_catalog = catalog.SchemaCatalog(schema_dir, use_cache=True, lazy=True)
+            self.assertEqual(my_lazy_catalog.alias, my_catalog.alias)
+            self.assertEqual(my_lazy_catalog.catalog_by_class, my_catalog.catalog_by_class)
+            my_lazy_catalog.getTypeInCatalog('ExampleResource.v1_0_0.ExampleResource')
+            self.assertEqual((my_lazy_catalog.cache.hits, my_lazy_catalog.cache.misses), (1, 0))
+
+    def test_parallel_catalog(self):
+        print('\n')
+        my_catalog = catalog.SchemaCatalog('./tests/testdata/schemas/')
+        my_parallel_catalog = catalog.SchemaCatalog('./tests/testdata/schemas/', jobs=2)
+        self.assertEqual(my_parallel_catalog.alias, my_catalog.alias)
+        self.assertEqual(my_parallel_catalog.catalog_by_class, my_catalog.catalog_by_class)
+        self.assertEqual(len(my_parallel_catalog.compiled), 0)
+        for name, doc in my_catalog.catalog.items():
+            self.assertEqual(my_parallel_catalog.catalog[name].edmx.to_json(), doc.edmx.to_json())
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            schema_dir = os.path.join(tmp_dir, 'schemas')
+            shutil.copytree('./tests/testdata/schemas/', schema_dir)
+            my_parallel_catalog = catalog.SchemaCatalog(schema_dir, use_cache=True, lazy=True, jobs=2)
+            self.assertEqual(len(my_parallel_catalog.catalog), 0)
+            self.assertEqual(my_parallel_catalog.cache.misses, 2)
+            my_cached_catalog = catalog.SchemaCatalog(schema_dir, use_cache=True, jobs=2)
+            self.assertEqual((my_cached_catalog.cache.hits, my_cached_catalog.cache.misses), (2, 0))
+
+    def test_type_versions(self):
+        my_catalog = catalog.SchemaCatalog('./tests/testdata/schemas/')
+
+        versions, namespaces = my_catalog.getTypeVersions('Example.v1_0_0', 'Example')
+        self.assertEqual(versions, sorted(versions))
+        self.assertEqual(namespaces[0], 'Example')
+        self.assertEqual(my_catalog.getHighestTypeVersion('Example.v1_0_0', 'Example'), 'Example.v1_7_0')
+        self.assertEqual(my_catalog.getHighestTypeVersion('Example', 'Example', 'Example.v1_2_0'), 'Example.v1_2_0')
+        self.assertEqual(my_catalog.getHighestTypeVersion('Example', 'Example', 'v0_9_0'), 'Example')
+        self.assertIsNone(my_catalog.getHighestTypeVersion('Example', 'Example', 'v0_9_0', versioned=True))
+        self.assertEqual(my_catalog.getSchemaInCatalog('Example.v1_0_0').getHighestType('Example.v1_0_0.Example', 'v1_3_0'), 'Example.v1_3_0.Example')
+
     def test_schema_doc(self):
         print('\n')
         my_catalog = catalog.SchemaCatalog('./tests/testdata/schemas/')
@@ -95,6 +182,17 @@ class TestCatalog(unittest.TestCase):
         prop = catalog.RedfishProperty("Edm.Guid").populate("123", check=True)
         prop = catalog.RedfishProperty("Edm.Guid").populate(catalog.REDFISH_ABSENT, check=True)
     
+    def test_type_validator(self):
+        my_catalog = catalog.SchemaCatalog('./tests/testdata/schemas/')
+        my_type = my_catalog.getTypeInCatalog('Example.v1_0_0.DeprecatedEnum')
+
+        my_validator = my_type.getValidator()
+        self.assertIs(my_validator, my_type.getValidator())
+        self.assertEqual(list(my_validator.Enumeration), ['On', 'Off'])
+        self.assertTrue(my_type.validate('On'))
+        self.assertRaises(ValueError, my_type.validate, 'Dimmed')
+        self.assertRaises(ValueError, my_type.validate, 1)
+    
     def test_object(self):
         print('\nTesting object values')
         my_catalog = catalog.SchemaCatalog('./tests/testdata/schemas/')
@@ -109,6 +207,47 @@ class TestCatalog(unittest.TestCase):
         dct = object.as_json()
         dct = object.getLinks()
 
+    def test_property_skeleton(self):
+        my_catalog = catalog.SchemaCatalog('./tests/testdata/schemas/')
+        my_type = my_catalog.getTypeInCatalog('Example.v1_7_0.Example')
+
+        self.assertIs(my_type.getPropertySkeleton(), my_type.getPropertySkeleton())
+        self.assertEqual(list(my_type.getPropertySkeleton()), list(my_type.getProperties()))
+
+        object = catalog.RedfishObject(my_type)
+        self.assertEqual(object.properties.values, {})
+        self.assertIn('Id', object)
+        self.assertEqual(list(object.properties), list(my_type.getProperties()))
+        self.assertIs(object['Id'], object['Id'])
+
+        object.properties['Extra'] = catalog.RedfishProperty('Edm.String', 'Extra', object)
+        self.assertEqual(list(object.properties)[-1], 'Extra')
+        del object.properties['Id']
+        self.assertNotIn('Id', object)
+        self.assertEqual(len(object.properties), len(my_type.getProperties()))
+
+    def test_populated_view(self):
+        my_catalog = catalog.SchemaCatalog('./tests/testdata/schemas/')
+        my_type = my_catalog.getTypeInCatalog('Example.v1_7_0.Example')
+
+        object = catalog.RedfishObject(my_type).populate({"Id": "Example", "Name": "Example"}, casted=True)
+        self.assertEqual(set(object.properties.values), {'Id', 'Name'})
+        self.assertEqual(list(object.properties), list(my_type.getProperties()))
+        self.assertTrue(object['Id'].Exists)
+        self.assertFalse(object['Description'].Exists)
+        self.assertNotIn('Description', object)
+        self.assertIn('Description', object.properties.values)
+
+    def test_additional_term(self):
+        my_catalog = catalog.SchemaCatalog('./tests/testdata/schemas/')
+        my_schema = my_catalog.getSchemaInCatalog('Example.v1_0_0')
+
+        my_term = my_schema.getAdditionalTerm('Edm.String')
+        self.assertIs(my_term, my_schema.getAdditionalTerm('Edm.String'))
+        self.assertEqual(my_term.getBaseType(), ('Edm.String', False))
+        self.assertTrue(catalog.RedfishProperty(my_term, 'Key').populate('Value', check=True).IsValid)
+        self.assertFalse(catalog.RedfishProperty(my_term, 'Key').populate(1, check=True).IsValid)
+
     def test_capabilities(self):
         my_catalog = catalog.SchemaCatalog('./tests/testdata/schemas/')
         my_schema_doc = my_catalog.getSchemaDocByClass("Example.v1_0_0.Example")
@@ -122,6 +261,46 @@ class TestCatalog(unittest.TestCase):
         self.assertTrue(my_type.CanUpdate)
         self.assertFalse(my_type.CanInsert)
         self.assertFalse(my_type.CanDelete)
+
+    def test_type_facts(self):
+        my_catalog = catalog.SchemaCatalog('./tests/testdata/schemas/')
+        my_schema_doc = my_catalog.getSchemaDocByClass("Example.v1_0_0.Example")
+        my_type = my_schema_doc.getTypeInSchemaDoc("Example.v1_0_0.Example")
+
+        my_facts = my_type.getFacts()
+        self.assertIs(my_facts, my_type.getFacts())
+        self.assertEqual(dict(my_facts.Capabilities), my_type.getCapabilities())
+        self.assertEqual(list(my_facts.Uris), my_type.getUris())
+        self.assertEqual(my_facts.HasAdditional, my_type.HasAdditional)
+
+        # Copies handed out must not alter the cached facts
+        my_type.getCapabilities()['CanInsert'] = True
+        my_type.getUris().clear()
+        self.assertFalse(my_type.CanInsert)
+        self.assertEqual(len(my_type.getUris()), 3)
+    
+    def test_type_tree_memo(self):
+        my_catalog = catalog.SchemaCatalog('./tests/testdata/schemas/')
+        my_type = my_catalog.getTypeInCatalog('Example.v1_7_0.Example')
+
+        my_tree = my_type.getTypeTree()
+        self.assertEqual(my_tree, my_type.getTypeTree())
+        self.assertIn('ExampleResource.v1_0_0.ExampleResource', my_tree)
+        my_properties = my_type.getProperties()
+        self.assertIs(my_properties, my_type.getProperties())
+
+        my_catalog.invalidate()
+        self.assertIsNot(my_properties, my_type.getProperties())
+        self.assertEqual(dict(my_properties), dict(my_type.getProperties()))
+    
+    def test_uri_matcher(self):
+        my_matcher = catalog.UriMatcher(['/redfish/v1/Example', '/redfish/v1/Examples/{ExampleId}', '/redfish/v1/Other/{OtherId}/Sub'])
+
+        self.assertEqual(my_matcher.match('/redfish/v1/Example'), ('/redfish/v1/Example', None))
+        self.assertEqual(my_matcher.match('/redfish/v1/Examples/1'), ('/redfish/v1/Examples/{ExampleId}', '1'))
+        self.assertEqual(my_matcher.match('/redfish/v1/Other/1/Sub'), ('/redfish/v1/Other/{OtherId}/Sub', None))
+        self.assertIsNone(my_matcher.match('/redfish/v1/Examples'))
+        self.assertIsNone(catalog.UriMatcher([]).match('/redfish/v1/Examples'))
     
     def test_expected_uris(self):
         print('\nTesting expected Uris')
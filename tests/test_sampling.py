@@ -0,0 +1,66 @@
+# Copyright Notice:
+# Copyright 2017-2019 DMTF. All rights reserved.
+# License: BSD 3-Clause License. For full text see link: https://github.com/DMTF/Redfish-Service-Validator/blob/master/LICENSE.md
+#
+# Unit tests for sampling.py
+#
+
+import unittest
+import sys
+from collections import namedtuple
+
+sys.path.append('../')
+
+import redfish_service_validator.sampling as sampling
+
+LinkType = namedtuple('LinkType', ['fulltype'])
+Link = namedtuple('Link', ['Type', 'Value'])
+
+
+def make_links(fulltype, uri, count):
+    return [Link(LinkType(fulltype), {'@odata.id': '{}/{}'.format(uri, x)}) for x in range(count)]
+
+
+class TestSampling(unittest.TestCase):
+    def test_parse_rules(self):
+        self.assertEqual(sampling.parseSamplingRules(sampling.DEFAULT_SAMPLING), [sampling.SamplingRule('LogEntry', 'first', 15)])
+        self.assertEqual(sampling.parseSamplingRules(' /redfish/v1/Chassis/*/Sensors/* = reservoir:20 ;Drive=stratified:2;'),
+                         [sampling.SamplingRule('/redfish/v1/Chassis/*/Sensors/*', 'reservoir', 20), sampling.SamplingRule('Drive', 'stratified', 2)])
+        self.assertEqual(sampling.parseSamplingRules(''), [])
+        for text in ['LogEntry', 'LogEntry=last:15', 'LogEntry=first', '=first:2']:
+            with self.assertRaises(ValueError):
+                sampling.parseSamplingRules(text)
+
+    def test_sample_links(self):
+        others = make_links('Example.v1_0_0.Example', '/redfish/v1/Examples', 3)
+        entries = make_links('LogEntry.v1_0_0.LogEntry', '/redfish/v1/Managers/1/LogServices/Log/Entries', 40)
+        sensors = make_links('Sensor.v1_0_0.Sensor', '/redfish/v1/Chassis/1/Sensors', 40)
+        rules = sampling.parseSamplingRules('LogEntry=first:15;/redfish/v1/Chassis/*/Sensors/*=reservoir:5')
+
+        kept, notes, summary = sampling.sampleLinks(rules, entries + others + sensors, 0, '/redfish/v1/Chassis/1')
+        self.assertEqual(kept[:18], others + entries[:15])
+        self.assertEqual(len(kept), 23)
+        self.assertEqual(summary, ['LogEntry first 15 of 40', '/redfish/v1/Chassis/*/Sensors/* reservoir 5 of 40'])
+        self.assertEqual(len(notes), 20)
+        self.assertEqual(notes[id(kept[-1])], 'Sampled: /redfish/v1/Chassis/*/Sensors/* reservoir 5 of 40')
+
+        # the same seed picks the same members, in their order
+        sampled = [sensors.index(x) for x in kept[18:]]
+        self.assertEqual(sampled, sorted(sampled))
+        self.assertEqual(sampling.sampleLinks(rules, sensors, 0, '/redfish/v1/Chassis/1')[0], kept[18:])
+        self.assertNotEqual(sampling.sampleLinks(rules, sensors, 1, '/redfish/v1/Chassis/1')[0], kept[18:])
+
+        # nothing left out, nothing noted
+        kept, notes, summary = sampling.sampleLinks(rules, others + entries[:10], 0, '')
+        self.assertEqual((kept, notes, summary), (others + entries[:10], {}, []))
+
+    def test_stratified(self):
+        drives = make_links('Drive.v1_0_0.Drive', '/redfish/v1/Systems/1/Storage/1/Drives', 10)
+        strata = {id(x): 'Drive.v1_{}_0.Drive'.format(num % 3) for num, x in enumerate(drives)}
+        kept, notes, summary = sampling.sampleLinks(sampling.parseSamplingRules('Drive=stratified:2'), drives, getStratum=lambda x: strata[id(x)])
+        self.assertEqual(kept, drives[:6])
+        self.assertEqual(summary, ['Drive stratified 6 of 10'])
+
+
+if __name__ == '__main__':
+    unittest.main()
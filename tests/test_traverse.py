@@ -0,0 +1,566 @@
+# Copyright Notice:
+# Copyright 2017-2019 DMTF. All rights reserved.
+# License: BSD 3-Clause License. For full text see link: https://github.com/DMTF/Redfish-Service-Validator/blob/master/LICENSE.md
+#
+# Unit tests for traverse.py and validateResource.py, against a local service
+#
+
+import unittest
+import sys
+import json
+import logging
+import threading
+import os
+import tempfile
+import hashlib
+import shutil
+import asyncio
+from unittest import mock
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.append('../')
+
+logging.Logger.verbose1 =  logging.Logger.debug
+logging.Logger.verbose2 =  logging.Logger.debug
+
+import redfish as rf
+
+import redfish_service_validator.traverse as traverse
+import redfish_service_validator.mockup as mockup
+import redfish_service_validator.cache as cache
+import redfish_service_validator.sampling as sampling
+import redfish_service_validator.async_traverse as async_traverse
+from redfish_service_validator.validateResource import validateSingleURI, validateURITree
+from redfish_service_validator.RedfishServiceValidator import validateMockups
+
+service_resources = {
+    '/redfish/v1': {'@odata.id': '/redfish/v1', '@odata.type': '#ServiceRoot.v1_0_0.ServiceRoot', 'Id': 'RootService', 'Name': 'Root Service', 'RedfishVersion': '1.6.0',
+                    'ProtocolFeaturesSupported': {'ExpandQuery': {'NoLinks': True, 'Levels': True, 'MaxLevels': 3}}},
+    '/redfish/v1/Examples': {'@odata.id': '/redfish/v1/Examples', '@odata.type': '#ExampleCollection.ExampleCollection', 'Name': 'Examples',
+                             'Members': [{'@odata.id': '/redfish/v1/Examples/{}'.format(x)} for x in range(1, 8)], 'Members@odata.count': 7},
+    '/redfish/v1/Examples/1': {'@odata.id': '/redfish/v1/Examples/1', '@odata.type': '#Example.v1_0_0.Example', 'Id': '1', 'Name': 'Example 1',
+                               'Links': {'Contains': [{'@odata.id': '/redfish/v1/Examples/{}'.format(x)} for x in range(2, 8)] + [{'@odata.id': '/redfish/v1/Examples/9'}]}},
+}
+for x in range(2, 8):
+    service_resources['/redfish/v1/Examples/{}'.format(x)] = {'@odata.id': '/redfish/v1/Examples/{}'.format(x), '@odata.type': '#Example.v1_0_0.Example', 'Id': str(x), 'Name': 'Example {}'.format(x),
+                                                              'Links': {'ContainedBy': {'@odata.id': '/redfish/v1/Examples/1'}}}
+
+# a resource holding another one, reached through a fragment
+service_resources['/redfish/v1/Examples/10'] = {'@odata.id': '/redfish/v1/Examples/10', '@odata.type': '#Example.v1_0_0.Example', 'Id': '10', 'Name': 'Example 10',
+                                                'Oem': {'Items': [{'@odata.id': '/redfish/v1/Examples/10#/Oem/Items/0', '@odata.type': '#Example.v1_0_0.Example',
+                                                                   'Id': '11', 'Name': 'Example 11'}]}}
+
+# a resource paging its members, with the pages after the first one
+service_resources['/redfish/v1/Examples/8'] = {'@odata.id': '/redfish/v1/Examples/8', '@odata.type': '#Example.v1_0_0.Example', 'Id': '8', 'Name': 'Example 8',
+                                               'Members': [{'@odata.id': '/redfish/v1/Examples/2'}, {'@odata.id': '/redfish/v1/Examples/3'}],
+                                               'Members@odata.nextLink': '/redfish/v1/Examples/8?$skip=2'}
+service_pages = {
+    '/redfish/v1/Examples/8?$skip=2': {'Members': [{'@odata.id': '/redfish/v1/Examples/4'}, {'@odata.id': '/redfish/v1/Examples/5'}],
+                                       'Members@odata.nextLink': '/redfish/v1/Examples/8?$skip=4'},
+    '/redfish/v1/Examples/8?$skip=4': {'Members': [{'@odata.id': '/redfish/v1/Examples/6'}, {'@odata.id': '/redfish/v1/Examples/7'}]},
+}
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        path, _, query = self.path.partition('?')
+        path = path.rstrip('/')
+        self.server.requested.append(self.path)
+        payload = service_pages.get(self.path, service_resources.get(path))
+        if payload is not None and query == '$expand=.($levels=1)' and 'Members' in payload:
+            payload = dict(payload, Members=[service_resources[x['@odata.id']] for x in payload['Members']])
+        body = json.dumps(payload).encode() if payload is not None else b'{}'
+        etag = '"{}"'.format(hashlib.sha256(body).hexdigest()[:16])
+        if self.server.etags and path in service_resources and self.headers.get('If-None-Match') == etag:
+            self.server.not_modified.append(self.path)
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200 if path in service_resources else 404)
+        self.send_header('Content-Type', 'application/json')
+        if self.server.etags and path in service_resources:
+            self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_service():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ServiceHandler)
+    server.requested = []
+    server.etags, server.not_modified = False, []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_config(server, **kwargs):
+    config = {'ip': 'http://127.0.0.1:{}'.format(server.server_address[1]), 'schema_directory': './tests/testdata/schemas/',
+              'username': '', 'password': '', 'forceauth': False, 'authtype': 'None', 'token': '',
+              'ext_http_proxy': '', 'ext_https_proxy': '', 'serv_http_proxy': '', 'serv_https_proxy': '',
+              'uricheck': False, 'mockup': '', 'schema_cache': False}
+    config.update(kwargs)
+    return config
+
+
+def strip_times(results):
+    return {x: {k: v for k, v in y.items() if k not in ['rtime', 'counts', 'messages']} for x, y in results.items()}
+
+
+class TestTraverse(unittest.TestCase):
+    def test_prefetch_tree(self):
+        server = start_service()
+        try:
+            runs = []
+            for jobs in [1, 4]:
+                server.requested = []
+                my_service = traverse.rfService(make_config(server, jobs=jobs))
+                server.requested = []
+                success, counts, results, _, _ = validateURITree(my_service, '/redfish/v1/Examples/1', 'Target')
+                my_service.close()
+                runs.append((success, counts, strip_times(results), list(results), sorted(server.requested)))
+                # each resource is requested once
+                self.assertEqual(len(server.requested), len(set(server.requested)))
+
+            self.assertEqual(runs[0], runs[1])
+            self.assertEqual(my_service.prefetcher.used, 7)
+        finally:
+            server.shutdown()
+
+    def test_prefetch_limit(self):
+        server = start_service()
+        try:
+            my_service = traverse.rfService(make_config(server))
+            prefetcher = traverse.Prefetcher(my_service.context, 2, limit=3)
+            for x in range(1, 8):
+                prefetcher.prefetch('/redfish/v1/Examples/{}'.format(x), traverse.request_headers)
+            # only the latest responses are kept
+            self.assertEqual(list(prefetcher.futures), ['/redfish/v1/Examples/{}'.format(x) for x in range(5, 8)])
+            self.assertEqual((prefetcher.requested, prefetcher.dropped), (7, 4))
+            response, _ = prefetcher.get('/redfish/v1/Examples/1', traverse.request_headers)
+            self.assertEqual(response.dict, service_resources['/redfish/v1/Examples/1'])
+            response, _ = prefetcher.get('/redfish/v1/Examples/7', traverse.request_headers)
+            self.assertEqual(response.dict, service_resources['/redfish/v1/Examples/7'])
+            self.assertEqual(prefetcher.used, 1)
+            prefetcher.close()
+            my_service.close()
+        finally:
+            server.shutdown()
+
+    def test_expand_collections(self):
+        self.assertEqual(traverse.rfService.getExpandQuery({'ProtocolFeaturesSupported': {'ExpandQuery': {'NoLinks': True}}}), '$expand=.')
+        self.assertIsNone(traverse.rfService.getExpandQuery({'ProtocolFeaturesSupported': {'ExpandQuery': {'ExpandAll': True}}}))
+        self.assertIsNone(traverse.rfService.getExpandQuery(None))
+
+        server = start_service()
+        try:
+            my_service = traverse.rfService(make_config(server, expand=True))
+            self.assertEqual(my_service.expand_query, '$expand=.($levels=1)')
+            server.requested = []
+            my_service.expandCollections(['/redfish/v1/Examples'])
+            self.assertEqual(server.requested, ['/redfish/v1/Examples?$expand=.($levels=1)'])
+            self.assertEqual(my_service.expanded, 7)
+
+            success, data, response, _ = my_service.callResourceURI('/redfish/v1/Examples')
+            self.assertEqual((success, data, response.status), (True, service_resources['/redfish/v1/Examples'], 200))
+            for x in range(1, 8):
+                uri = '/redfish/v1/Examples/{}'.format(x)
+                success, data, response, _ = my_service.callResourceURI(uri)
+                self.assertEqual((success, data, response.getheader('Content-Type')), (True, service_resources[uri], 'application/json'))
+            self.assertEqual(len(server.requested), 1)
+
+            # members have no headers of their own to check, nor to record
+            success, counts, _, _, _ = validateSingleURI(my_service, '/redfish/v1/Examples/2', 'Member')
+            self.assertTrue(success)
+            self.assertEqual(counts['skipExpandedHeaders'], 1)
+            success, counts, _, _, _ = validateSingleURI(my_service, '/redfish/v1/Examples', 'Collection')
+            self.assertEqual(counts['skipExpandedHeaders'], 0)
+            my_service.close()
+
+            with tempfile.TemporaryDirectory() as record_dir:
+                my_service = traverse.rfService(make_config(server, expand=True, record=record_dir))
+                my_service.expandCollections(['/redfish/v1/Examples'])
+                my_service.close()
+                self.assertEqual(sorted(os.listdir(os.path.join(record_dir, 'Examples'))), ['1', '2', '3', '4', '5', '6', '7', 'headers.json', 'index.json', 'time.json'])
+                self.assertEqual(os.listdir(os.path.join(record_dir, 'Examples', '2')), ['index.json'])
+                self.assertEqual(mockup.MockupIndex(record_dir).getResponse('Examples/2', marked=False).dict, service_resources['/redfish/v1/Examples/2'])
+        finally:
+            server.shutdown()
+
+    def test_collection_pages(self):
+        server = start_service()
+        try:
+            my_service = traverse.rfService(make_config(server))
+            server.requested = []
+            pages = list(my_service.getCollectionPages('/redfish/v1/Examples/8?$skip=2'))
+            self.assertEqual(pages, [(x, True, y['Members']) for x, y in service_pages.items()])
+            self.assertEqual(list(my_service.getCollectionPages('/redfish/v1/Missing?$skip=9')), [('/redfish/v1/Missing?$skip=9', False, [])])
+            # pages are not cached
+            self.assertEqual(len(my_service.cache), 2)
+
+            success, counts, results, _, _ = validateURITree(my_service, '/redfish/v1/Examples/8', 'Target')
+            self.assertEqual([x['uri'] for x in results.values()], ['/redfish/v1/Examples/8'])
+            my_service.close()
+
+            my_service = traverse.rfService(make_config(server, paged_member_limit=3))
+            server.requested = []
+            success, counts, results, _, _ = validateURITree(my_service, '/redfish/v1/Examples/8', 'Target')
+            self.assertEqual({x: y['uri'] for x, y in results.items()},
+                             {'Target': '/redfish/v1/Examples/8', 'Target -> Members#2': '/redfish/v1/Examples/4',
+                              'Target -> Members#3': '/redfish/v1/Examples/5', 'Target -> Members#4': '/redfish/v1/Examples/6',
+                              'Target -> ContainedBy': '/redfish/v1/Examples/1'})
+            self.assertEqual([x for x in server.requested if '?' in x], list(service_pages))
+            my_service.close()
+        finally:
+            server.shutdown()
+
+    def test_sampling(self):
+        server = start_service()
+        try:
+            my_service = traverse.rfService(make_config(server, sampling='/redfish/v1/Examples/*=first:2'))
+            success, counts, results, _, _ = validateURITree(my_service, '/redfish/v1/Examples/1', 'Target')
+            my_service.close()
+            self.assertEqual(list(results), ['Target', 'Target -> Contains#0', 'Target -> Contains#1'])
+            self.assertEqual(results['Target']['samplemapped'], 'Sampled members: /redfish/v1/Examples/* first 2 of 7')
+            self.assertEqual(results['Target -> Contains#1']['samplemapped'], 'Sampled: /redfish/v1/Examples/* first 2 of 7')
+            self.assertEqual(counts['skipSampled'], 5)
+
+            # members are sorted by their own types, read from the responses kept while checking their links
+            for x in range(5, 8):
+                service_resources['/redfish/v1/Examples/{}'.format(x)]['@odata.type'] = '#Example.v1_1_0.Example'
+            my_service = traverse.rfService(make_config(server, sampling='/redfish/v1/Examples/*=stratified:2'))
+            success, counts, results, _, _ = validateURITree(my_service, '/redfish/v1/Examples/1', 'Target')
+            my_service.close()
+            self.assertEqual([x['uri'] for x in results.values()], ['/redfish/v1/Examples/{}'.format(x) for x in [1, 2, 3, 5, 6, 9]])
+            self.assertEqual(counts['skipSampled'], 2)
+
+            # without requesting them again once dropped from the cache, but by the type of their links, with a warning
+            requested, sampleLinks_orig = [], sampling.sampleLinks
+            def sampleLinks(*args):
+                my_service.cache = cache.ResponseCache(0)
+                requested.append(list(server.requested))
+                sampled = sampleLinks_orig(*args)
+                requested.append(list(server.requested))
+                return sampled
+            records = []
+            handler = logging.Handler(logging.WARNING)
+            handler.emit = records.append
+            logging.getLogger().addHandler(handler)
+            my_service = traverse.rfService(make_config(server, sampling='/redfish/v1/Examples/*=stratified:2'))
+            with mock.patch.object(sampling, 'sampleLinks', sampleLinks):
+                success, counts, results, _, _ = validateURITree(my_service, '/redfish/v1/Examples/1', 'Target')
+            my_service.close()
+            logging.getLogger().removeHandler(handler)
+            self.assertEqual(requested[0], requested[1])
+            self.assertEqual([x['uri'] for x in results.values()], ['/redfish/v1/Examples/{}'.format(x) for x in [1, 2, 3]])
+            self.assertIn('/redfish/v1/Examples/1: 7 links sampled by the type of their link, as the types of their resources are not known; '
+                          'a larger response_cache_size keeps them', [x.getMessage() for x in records])
+        finally:
+            for x in range(5, 8):
+                service_resources['/redfish/v1/Examples/{}'.format(x)]['@odata.type'] = '#Example.v1_0_0.Example'
+            server.shutdown()
+
+    def test_record_mockup(self):
+        server = start_service()
+        try:
+            with tempfile.TemporaryDirectory() as record_dir:
+                my_service = traverse.rfService(make_config(server, record=record_dir))
+                success, counts, results, _, _ = validateURITree(my_service, '/redfish/v1/Examples/1', 'Target')
+                my_service.close()
+                self.assertEqual(sorted(os.listdir(os.path.join(record_dir, 'Examples', '2'))), ['headers.json', 'index.json', 'time.json'])
+                self.assertEqual(sorted(os.listdir(os.path.join(record_dir, 'Examples', '9'))), ['headers.json', 'index.json', 'status.json', 'time.json'])
+                with open(os.path.join(record_dir, 'Examples', '2', 'headers.json')) as f:
+                    self.assertEqual(json.load(f), {'GET': {'Content-Type': 'application/json'}})
+
+                # replayed without requesting the service
+                my_service = traverse.rfService(make_config(server, mockup=record_dir))
+                server.requested = []
+                success, replay_counts, replay_results, _, _ = validateURITree(my_service, '/redfish/v1/Examples/1', 'Target')
+                my_service.close()
+                self.assertEqual(server.requested, [])
+                self.assertEqual({x: (y['payload'], y['rcode'], y['success']) for x, y in replay_results.items()},
+                                 {x: (y['payload'], y['rcode'], y['success']) for x, y in results.items()})
+                self.assertEqual(replay_counts['warnMockupUsed'], 1)
+        finally:
+            server.shutdown()
+
+    def test_etag_store(self):
+        server = start_service()
+        server.etags = True
+        try:
+            with tempfile.TemporaryDirectory() as store_dir:
+                store = os.path.join(store_dir, 'etags.json')
+                my_service = traverse.rfService(make_config(server, etag_store=store))
+                success, counts, results, _, _ = validateURITree(my_service, '/redfish/v1/Examples/1', 'Target')
+                my_service.close()
+                self.assertEqual(server.not_modified, [])
+                self.assertTrue(os.path.isfile(store))
+
+                # a resource changed in the meantime is downloaded and validated again
+                service_resources['/redfish/v1/Examples/2']['Name'] = 'Changed Example'
+                try:
+                    server.requested = []
+                    my_service = traverse.rfService(make_config(server, etag_store=store))
+                    success, rerun_counts, rerun_results, _, _ = validateURITree(my_service, '/redfish/v1/Examples/1', 'Target')
+                    my_service.close()
+                finally:
+                    service_resources['/redfish/v1/Examples/2']['Name'] = 'Example 2'
+                self.assertEqual(sorted(server.not_modified), sorted(x for x in server.requested if x in service_resources and x != '/redfish/v1/Examples/2'))
+                # the ServiceRoot is not validated on the way to the target
+                self.assertEqual(my_service.etags.reused, len(server.not_modified) - 1)
+                self.assertEqual(rerun_results['Target']['payload'], results['Target']['payload'])
+                self.assertEqual(rerun_counts, counts)
+                self.assertEqual(rerun_results['Target -> Contains#0']['messages']['Name'].value, 'Changed Example')
+                self.assertEqual({x: (y['rcode'], y['success'], y['errors'], y['warns'], y['counts'], [vars(m) for m in y['messages'].values()]) for x, y in rerun_results.items() if x != 'Target -> Contains#0'},
+                                 {x: (y['rcode'], y['success'], y['errors'], y['warns'], y['counts'], [vars(m) for m in y['messages'].values()]) for x, y in results.items() if x != 'Target -> Contains#0'})
+        finally:
+            server.shutdown()
+
+    def test_etag_store_fragment(self):
+        server = start_service()
+        server.etags = True
+        fragment = '/redfish/v1/Examples/10#/Oem/Items/0'
+        try:
+            with tempfile.TemporaryDirectory() as store_dir:
+                store = os.path.join(store_dir, 'etags.json')
+                runs = []
+                for run in range(2):
+                    my_service = traverse.rfService(make_config(server, etag_store=store))
+                    success, counts, results, _, _ = validateSingleURI(my_service, fragment, 'Target')
+                    my_service.close()
+                    runs.append((success, dict(counts), results['Target']['errors'], results['Target']['payload']))
+                # the base document is not modified, but the result of the fragment is not reused
+                self.assertIn('/redfish/v1/Examples/10', server.not_modified)
+                self.assertEqual(my_service.etags.reused, 0)
+                self.assertNotIn('result', my_service.etags.resources['/redfish/v1/Examples/10'])
+                self.assertEqual(runs[0], runs[1])
+        finally:
+            server.shutdown()
+
+    def test_result_store(self):
+        server = start_service()
+        try:
+            with tempfile.TemporaryDirectory() as store_dir:
+                store = os.path.join(store_dir, 'results.json')
+                schema_dir = os.path.join(store_dir, 'schemas')
+                shutil.copytree('./tests/testdata/schemas', schema_dir)
+                my_service = traverse.rfService(make_config(server, result_store=store, schema_directory=schema_dir))
+                success, counts, results, _, _ = validateURITree(my_service, '/redfish/v1/Examples/1', 'Target')
+                my_service.close()
+                self.assertEqual((my_service.results.reused, my_service.results.validated), (0, 7))
+
+                # only the resource that changed is validated again
+                service_resources['/redfish/v1/Examples/2']['Name'] = 'Changed Example'
+                try:
+                    my_service = traverse.rfService(make_config(server, result_store=store, schema_directory=schema_dir))
+                    success, rerun_counts, rerun_results, _, _ = validateURITree(my_service, '/redfish/v1/Examples/1', 'Target')
+                    my_service.close()
+                finally:
+                    service_resources['/redfish/v1/Examples/2']['Name'] = 'Example 2'
+                self.assertEqual((my_service.results.reused, my_service.results.validated), (6, 1))
+                self.assertEqual(rerun_counts, counts)
+                self.assertEqual(rerun_results['Target -> Contains#0']['messages']['Name'].value, 'Changed Example')
+                self.assertEqual({x: (y['success'], y['errors'], y['warns'], y['counts'], [vars(m) for m in y['messages'].values()]) for x, y in rerun_results.items() if x != 'Target -> Contains#0'},
+                                 {x: (y['success'], y['errors'], y['warns'], y['counts'], [vars(m) for m in y['messages'].values()]) for x, y in results.items() if x != 'Target -> Contains#0'})
+
+                # new schema files, every resource is validated again
+                with open(os.path.join(schema_dir, 'Example_v1.xml'), 'a') as f:
+                    f.write('\n')
+                my_service = traverse.rfService(make_config(server, result_store=store, schema_directory=schema_dir))
+                validateURITree(my_service, '/redfish/v1/Examples/1', 'Target')
+                my_service.close()
+                self.assertEqual((my_service.results.reused, my_service.results.validated), (0, 7))
+        finally:
+            server.shutdown()
+
+    def test_mockup_paths(self):
+        self.assertEqual(mockup.getMockupKey('/redfish/v1/Examples/1/'), 'Examples/1')
+        for uri in ['/redfish/v1/../../outside', '/redfish/v1/Examples/..', '/redfish/v1/Examples//1', '/redfish/v1/./Examples']:
+            self.assertIsNone(mockup.getMockupKey(uri), uri)
+
+        with tempfile.TemporaryDirectory() as top_dir:
+            record_dir = os.path.join(top_dir, 'record')
+            recorder = mockup.MockupRecorder(record_dir)
+            response = rf.rest.v1.StaticRestResponse(Status=200, Headers={'Content-Type': 'application/json'}, Content={})
+            for uri in ['/redfish/v1/../../outside', '/redfish/v1/Examples/../../../outside']:
+                recorder.record(uri, response, timedelta(seconds=1))
+            # nor through a link to a folder outside
+            os.makedirs(record_dir)
+            os.symlink(top_dir, os.path.join(record_dir, 'Link'))
+            recorder.record('/redfish/v1/Link/outside', response, timedelta(seconds=1))
+            self.assertEqual(recorder.recorded, 0)
+            self.assertEqual(sorted(os.listdir(top_dir)), ['record'])
+
+            recorder.record('/redfish/v1/Examples/1', response, timedelta(seconds=1))
+            lines = os.path.join(top_dir, 'mockup.jsonl')
+            with open(lines, 'w') as f:
+                f.write(json.dumps({'@odata.id': '/redfish/v1/../outside'}) + '\n')
+                f.write(json.dumps({'@odata.id': '/redfish/v1/Examples/1'}) + '\n')
+            for source in [record_dir, lines]:
+                index = mockup.MockupIndex(source)
+                self.assertEqual(list(index.entries), ['Examples/1'])
+                self.assertIsNone(index.getKey('/redfish/v1/Examples/1/../../../outside', layouts=True))
+
+    def test_offline_mockup(self):
+        with tempfile.TemporaryDirectory() as mockup_dir:
+            # in the layout of the mockups published by DMTF, with the ServiceRoot at the top
+            for uri, payload in service_resources.items():
+                folder = os.path.join(mockup_dir, uri.replace('/redfish/v1', '', 1).strip('/'))
+                os.makedirs(folder, exist_ok=True)
+                with open(os.path.join(folder, 'index.json'), 'w') as f:
+                    json.dump(payload, f)
+
+            server = start_service()
+            try:
+                my_service = traverse.rfService(make_config(server))
+                _, counts, results, _, _ = validateURITree(my_service, '/redfish/v1/Examples/1', 'Target')
+                my_service.close()
+            finally:
+                server.shutdown()
+
+            with tempfile.TemporaryDirectory() as archive_dir:
+                # the same mockup as an archive of its folder, and as lines of payloads
+                archive = shutil.make_archive(os.path.join(archive_dir, 'mockup'), 'zip', os.path.dirname(mockup_dir), os.path.basename(mockup_dir))
+                lines = os.path.join(archive_dir, 'mockup.jsonl')
+                with open(lines, 'w') as f:
+                    for payload in service_resources.values():
+                        f.write(json.dumps(payload) + '\n')
+
+                for source in [mockup_dir, archive, lines]:
+                    config = make_config(server, offline=True, mockup=source)
+                    config['ip'] = None
+                    my_service = traverse.rfService(config)
+                    self.assertEqual(my_service.service_root, service_resources['/redfish/v1'])
+                    _, offline_counts, offline_results, _, _ = validateURITree(my_service, '/redfish/v1/Examples/1', 'Target')
+                    my_service.close()
+                    self.assertEqual({x: (y['payload'], y['rcode'], y['success'], y['errors']) for x, y in offline_results.items()},
+                                     {x: (y['payload'], y['rcode'], y['success'], y['errors']) for x, y in results.items()})
+                    self.assertEqual(offline_counts, counts)
+                    self.assertEqual(len(my_service.context.index.entries), len(service_resources))
+                    # nothing of the payloads is kept by the index itself
+                    self.assertFalse(any('body' in str(x) or 'record' in x for x in my_service.context.index.entries.values()))
+
+            with self.assertRaises(ValueError):
+                traverse.rfService(dict(config, mockup=os.path.join(mockup_dir, 'Missing')))
+
+            with tempfile.TemporaryDirectory() as logdir:
+                mockup_results = validateMockups([mockup_dir, mockup_dir + '/'], logdir, ['--schema_directory', './tests/testdata/schemas/',
+                                                                                      '--payload', 'Tree', '/redfish/v1/Examples/1'], 2)
+                self.assertEqual(list(mockup_results), [mockup_dir, mockup_dir + '/'])
+                reports = [x[1] for x in mockup_results.values()]
+                self.assertEqual([os.path.dirname(x) for x in reports], [os.path.join(logdir, os.path.basename(mockup_dir)), os.path.join(logdir, os.path.basename(mockup_dir) + '_2')])
+                for status_code, report, message in mockup_results.values():
+                    self.assertEqual(message, 'Validation done')
+                    self.assertTrue(os.path.isfile(report))
+
+    def test_concurrency_window(self):
+        window = traverse.ConcurrencyWindow(4)
+        fast = timedelta(seconds=0.05)
+        for x in range(20):
+            window.release(window.acquire(), 200, fast)
+        self.assertEqual(window.size, 4)
+        self.assertEqual([x[1] for x in window.history], [1, 2, 3, 4])
+
+        # responses to requests in flight before the window is halved do not halve it again
+        started = [window.acquire() for x in range(4)]
+        window.release(started[0], 503, fast)
+        window.release(started[1], 503, fast)
+        self.assertEqual(window.size, 2)
+        window.release(started[2], 200, fast)
+        window.release(started[3], None, fast)
+        self.assertEqual(window.size, 2)
+
+        # a slow response halves it too, while the average latency catches up
+        window.release(window.acquire(), 200, timedelta(seconds=1))
+        self.assertEqual(window.size, 1)
+        self.assertEqual(window.history[-1][1:], (1, 'latency of 1.000s over an average of 0.050s'))
+        window.release(window.acquire(), 200, timedelta(seconds=0.5))
+        self.assertEqual((window.size, window.active), (2, 0))
+        self.assertIn('final 2, largest 4, 6 changes', window.getStats())
+
+    def test_async_service(self):
+        servers = [start_service(), start_service()]
+        try:
+            expected = []
+            for server in servers:
+                my_service = traverse.rfService(make_config(server))
+                expected.append(strip_times(validateURITree(my_service, '/redfish/v1/Examples/1', 'Target')[2]))
+                my_service.close()
+
+            async def validate(my_service):
+                results = {}
+                for uri in ['/redfish/v1/Examples/1'] + ['/redfish/v1/Examples/{}'.format(x) for x in range(2, 8)]:
+                    success, counts, my_results, links, _ = await my_service.validateSingleURI(uri, uri)
+                    results.update(my_results)
+                return results
+
+            async def run():
+                my_services = [await async_traverse.AsyncService.create(make_config(server), connections=2) for server in servers]
+                # the blocking client of the redfish library is never used once the services are set up
+                blocking = []
+                for my_service in my_services:
+                    my_service.service.context.get = lambda *args, **kwargs: blocking.append(args)
+                for server in servers:
+                    server.requested = []
+                results = await asyncio.gather(*[validate(x) for x in my_services])
+                self.assertEqual(blocking, [])
+                prefetchers = [x.service.prefetcher for x in my_services]
+                pools = [list(x.client.pools.values()) for x in prefetchers]
+                for my_service in my_services:
+                    my_service.close()
+                return results, prefetchers, pools
+
+            results, prefetchers, pools = asyncio.run(run())
+            for server, my_results, my_expected, prefetcher, my_pools in zip(servers, results, expected, prefetchers, pools):
+                self.assertEqual(my_results['/redfish/v1/Examples/1']['payload'], my_expected['Target']['payload'])
+                self.assertEqual({x: y['payload'] for x, y in my_results.items() if x != '/redfish/v1/Examples/1'},
+                                 {y['uri']: y['payload'] for x, y in my_expected.items() if x.startswith('Target -> ') and y['rcode'] != 404})
+                # the messages of each resource are its own, while the services are validated at once
+                self.assertEqual({x: (y['errors'], y['warns']) for x, y in my_results.items()},
+                                 {y['uri']: (y['errors'], y['warns']) for y in my_expected.values() if y['rcode'] != 404})
+                # every resource is requested once, over at most two keep-alive connections
+                self.assertEqual(sorted(server.requested), sorted(set(server.requested)))
+                self.assertEqual(prefetcher.requested, prefetcher.used)
+                self.assertEqual(len(my_pools), 1)
+                self.assertLessEqual(my_pools[0].opened, 2)
+        finally:
+            for server in servers:
+                server.shutdown()
+
+    def test_chunked_response(self):
+        async def serve(reader, writer):
+            await reader.readuntil(b'\r\n\r\n')
+            writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nTransfer-Encoding: chunked\r\n\r\n'
+                         b'5\r\n{"a":\r\n3\r\n 1}\r\n0\r\n\r\n')
+            await writer.drain()
+            await reader.readuntil(b'\r\n\r\n')
+            writer.write(b'HTTP/1.0 404 Not Found\r\nContent-Length: 2\r\n\r\n{}')
+            await writer.drain()
+            writer.close()
+
+        async def run():
+            server = await asyncio.start_server(serve, '127.0.0.1', 0)
+            url = 'http://127.0.0.1:{}/redfish/v1'.format(server.sockets[0].getsockname()[1])
+            client = async_traverse.AsyncHTTPClient(connections=1)
+            first = await client.get(url, {})
+            second = await client.get(url, {})
+            pool = list(client.pools.values())[0]
+            client.close()
+            server.close()
+            return first, second, pool
+
+        first, second, pool = asyncio.run(run())
+        self.assertEqual((first.status, first.dict, first.getheader('content-type')), (200, {'a': 1}, 'application/json'))
+        self.assertEqual(second.status, 404)
+        self.assertEqual((pool.opened, pool.idle), (1, []))
+
+
+if __name__ == '__main__':
+    unittest.main()